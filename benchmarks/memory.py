@@ -0,0 +1,87 @@
+"""Result-retention memory benchmark.
+
+Compares peak traced memory of keeping every CompanyData model for a run
+against RetailWarehouseScraper.process_companies as the scrape command runs
+it (default batch size, ResultBuffer chunks), with the LLM pipeline replaced
+by a stub that returns a ready-made result:
+
+    uv run python benchmarks/memory.py --companies 100000
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.main  # noqa: E402
+from src.models.company import BusinessVertical, CompanyData  # noqa: E402
+
+VERTICALS = list(BusinessVertical)
+
+
+def _company(i: int) -> CompanyData:
+    return CompanyData(
+        company_name=f"Company {i} Inc",
+        cleaned_name=f"Company {i}",
+        vertical=VERTICALS[i % len(VERTICALS)],
+        truck_count=i % 500 or None,
+        warehouse_employee_count=i % 2000,
+        facility_count=i % 40,
+        store_count=i % 900,
+        notes="Fleet size from annual report; store count from locations page.",
+        source_references=[f"https://company{i}.example.com/about", f"https://news.example.com/article/{i}"],
+        confidence_score=0.8,
+    )
+
+
+class StubScraper(src.main.RetailWarehouseScraper):
+    """Scraper whose per-company pipeline just builds the result model"""
+
+    async def process_company(self, company_name, vertical, session):
+        return _company(int(company_name.split(" ")[1]))
+
+
+def _measure(label: str, run):
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} peak {peak / 2**20:>9.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=5)
+    args = parser.parse_args()
+
+    companies = [(f"Company {i} Inc", VERTICALS[i % len(VERTICALS)].value) for i in range(args.companies)]
+
+    def keep_models():
+        results = []
+        for i in range(args.companies):
+            results.append(_company(i))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_PATH"] = str(Path(tmp) / "companies.db")
+        src.main.BATCH_PAUSE_SECONDS = 0
+        scraper = StubScraper("benchmark", "benchmark")
+        scraper.engine  # Create the database outside the measured run
+
+        def process_companies():
+            asyncio.run(scraper.process_companies(companies, Path(tmp) / "out.csv", args.batch_size))
+
+        print(f"{args.companies} companies")
+        _measure("list[CompanyData]", keep_models)
+        _measure(f"process_companies (batch={args.batch_size})", process_companies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""CLI startup-time benchmark.
+
+Times fresh interpreter runs of the CLI so import cost is included:
+
+    uv run python benchmarks/startup.py --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _seed_database(db_path: Path):
+    """Create a database holding one fresh company so `search` hits the cache"""
+    sys.path.insert(0, str(ROOT))
+    from src.database.connection import get_db_engine, get_db_session
+    from src.models.database import Base, Company
+
+    engine = get_db_engine(str(db_path))
+    Base.metadata.create_all(engine)
+    with get_db_session(engine) as session:
+        session.add(
+            Company(
+                company_name="Benchmark Foods Inc",
+                normalized_name="benchmark foods",
+                cleaned_name="Benchmark Foods",
+                vertical="Grocery",
+                truck_count=100,
+                last_updated=datetime.now(),
+            )
+        )
+        session.commit()
+
+
+def _time_command(args, env, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "companies.db"
+        _seed_database(db_path)
+        env = {**os.environ, "DATABASE_PATH": str(db_path), "OPENAI_API_KEY": "bench", "FIRECRAWL_API_KEY": "bench"}
+
+        commands = {
+            "python -c pass (baseline)": ["-c", "pass"],
+            "cli --help": ["-m", "src.cli", "--help"],
+            "cli scrape --help": ["-m", "src.cli", "scrape", "--help"],
+            "cli search (cached company)": ["-m", "src.cli", "search", "-c", "Benchmark Foods", "-v", "Grocery"],
+        }
+
+        print(f"{'command':<32} {'median':>9} {'min':>9}")
+        for label, command in commands.items():
+            timings = _time_command(command, env, args.runs)
+            print(f"{label:<32} {statistics.median(timings):>8.3f}s {min(timings):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,16 @@ from typing import List, Optional
 
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.usage import Usage, UsageLimits
 
 from ..models.company import CompanyData, ScrapedData, SearchQuery
+from ..tools.rate_limiter import SharedRateLimiter
 
 
 class AnalysisAgent:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, rate_limiter: Optional[SharedRateLimiter] = None):
         self.model = OpenAIModel("gpt-4-turbo-preview", api_key=api_key)
+        self.rate_limiter = rate_limiter
 
         self.agent = Agent(
             self.model,
@@ -41,12 +44,23 @@ class AnalysisAgent:
                     return int(match.group(1).replace(",", ""))
             return None
 
-    async def analyze_company_data(self, query: SearchQuery, scraped_data: List[ScrapedData]) -> CompanyData:
+    async def analyze_company_data(
+        self,
+        query: SearchQuery,
+        scraped_data: List[ScrapedData],
+        usage: Optional[Usage] = None,
+        max_content_chars: Optional[int] = None,
+        usage_limits: Optional[UsageLimits] = None,
+    ) -> CompanyData:
         """Analyze scraped data and return structured company information"""
         # Combine all scraped content
-        combined_content = "\n\n".join([f"Source: {data.url}\n{data.content}" for data in scraped_data])
+        combined_content = "\n\n".join(
+            [f"Source: {data.url}\n{data.content[:max_content_chars]}" for data in scraped_data]
+        )
 
         # Run analysis
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
         result = await self.agent.run(
             combined_content,
             deps={
@@ -54,6 +68,8 @@ class AnalysisAgent:
                 "vertical": query.vertical,
                 "urls": [str(data.url) for data in scraped_data],
             },
+            usage=usage,
+            usage_limits=usage_limits,
         )
 
         return result.data
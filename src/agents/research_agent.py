@@ -3,17 +3,22 @@ from typing import Dict, List, Optional
 
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.usage import Usage, UsageLimits
 
 from ..models.company import SearchQuery
 from ..tools.firecrawl_client import FirecrawlClient
+from ..tools.rate_limiter import SharedRateLimiter
 from ..tools.web_search import WebSearchTool
 
 
 class ResearchAgent:
-    def __init__(self, api_key: str, tavily_api_key: Optional[str] = None):
+    def __init__(
+        self, api_key: str, tavily_api_key: Optional[str] = None, rate_limiter: Optional[SharedRateLimiter] = None
+    ):
         self.model = OpenAIModel("gpt-4-turbo-preview", api_key=api_key)
-        self.search_tool = WebSearchTool(api_key=tavily_api_key)
-        self.firecrawl = FirecrawlClient()
+        self.rate_limiter = rate_limiter
+        self.search_tool = WebSearchTool(api_key=tavily_api_key, rate_limiter=rate_limiter)
+        self.firecrawl = FirecrawlClient(rate_limiter=rate_limiter)
 
         self.agent = Agent(
             self.model,
@@ -70,7 +75,9 @@ class ResearchAgent:
             scored_results.sort(key=lambda x: x[0], reverse=True)
             return [url for score, url in scored_results[:5]]
 
-    async def research_company(self, query: SearchQuery) -> List[str]:
+    async def research_company(
+        self, query: SearchQuery, usage: Optional[Usage] = None, usage_limits: Optional[UsageLimits] = None
+    ) -> List[str]:
         search_queries = [
             f'"{query.company_name}" fleet size trucks vehicles',
             f'"{query.company_name}" warehouse distribution center employees',
@@ -95,6 +102,8 @@ class ResearchAgent:
                 seen_urls.add(url)
                 unique_results.append(result)
         if unique_results:
-            result = await self.agent.run(unique_results, deps=query)
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            result = await self.agent.run(unique_results, deps=query, usage=usage, usage_limits=usage_limits)
             return result.data
         return []
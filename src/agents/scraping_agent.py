@@ -1,17 +1,20 @@
 import asyncio
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.usage import Usage, UsageLimits
 
 from ..models.company import ScrapedData
 from ..tools.firecrawl_client import FirecrawlClient
+from ..tools.rate_limiter import SharedRateLimiter
 
 
 class ScrapingAgent:
-    def __init__(self, api_key: str, firecrawl_api_key: str):
+    def __init__(self, api_key: str, firecrawl_api_key: str, rate_limiter: Optional[SharedRateLimiter] = None):
         self.model = OpenAIModel("gpt-4-turbo-preview", api_key=api_key)
-        self.firecrawl = FirecrawlClient(api_key=firecrawl_api_key)
+        self.rate_limiter = rate_limiter
+        self.firecrawl = FirecrawlClient(api_key=firecrawl_api_key, rate_limiter=rate_limiter)
 
         self.agent = Agent(
             self.model,
@@ -34,9 +37,19 @@ class ScrapingAgent:
                 url, {"formats": ["markdown", "structured_data"], "onlyMainContent": True}
             )
 
-    async def scrape_urls(self, urls: List[str]) -> List[ScrapedData]:
-        """Scrape multiple URLs concurrently"""
-        tasks = [self.agent.run(url) for url in urls]
+    async def _run(self, url: str, usage: Optional[Usage], usage_limits: Optional[UsageLimits]):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        return await self.agent.run(url, usage=usage, usage_limits=usage_limits)
+
+    async def scrape_urls(
+        self, urls: List[str], usage: Optional[Usage] = None, usage_limits: Optional[UsageLimits] = None
+    ) -> List[ScrapedData]:
+        """Scrape multiple URLs concurrently, accumulating LLM usage into usage when given.
+
+        usage_limits is checked against the shared usage, so it caps all of the URLs together.
+        """
+        tasks = [self._run(url, usage, usage_limits) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         scraped_data = []
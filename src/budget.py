@@ -0,0 +1,175 @@
+import multiprocessing
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    # Imported lazily elsewhere; pydantic_ai is expensive to import
+    from pydantic_ai.usage import Usage, UsageLimits
+
+# Pipeline stages that call the LLM
+STAGES = ("research", "scraping", "analysis")
+
+_USAGE_FIELDS = ("requests", "request_tokens", "response_tokens", "total_tokens")
+
+# Limits applied once the run leaves NORMAL mode
+ECONOMY_MAX_URLS = 1
+ECONOMY_CONTENT_CHARS = 4000
+
+# Verticals of new companies that are not enriched at all once the run is in CONSERVE mode
+LOW_VALUE_VERTICALS = ("General",)
+
+
+class BudgetMode(str, Enum):
+    NORMAL = "normal"
+    # Fewer URLs scraped and shorter content sent to analysis
+    ECONOMY = "economy"
+    # Economy, stale cached records are served as-is instead of refreshed and
+    # new companies in low-value verticals are skipped
+    CONSERVE = "conserve"
+    # Ceiling reached: no new LLM work is started
+    PAUSED = "paused"
+
+
+def max_urls(mode: "BudgetMode") -> int:
+    """How many researched URLs to scrape per company"""
+    return 3 if mode == BudgetMode.NORMAL else ECONOMY_MAX_URLS
+
+
+def content_budget(mode: "BudgetMode") -> Optional[int]:
+    """Characters of content per source sent to analysis, None for no limit"""
+    return None if mode == BudgetMode.NORMAL else ECONOMY_CONTENT_CHARS
+
+
+def usage_tokens(usage: "Usage") -> int:
+    """Total tokens of a usage, falling back to request + response tokens"""
+    if usage.total_tokens is not None:
+        return usage.total_tokens
+    return (usage.request_tokens or 0) + (usage.response_tokens or 0)
+
+
+def usage_to_dict(usage: "Usage") -> Dict[str, int]:
+    return {
+        "requests": usage.requests,
+        "request_tokens": usage.request_tokens or 0,
+        "response_tokens": usage.response_tokens or 0,
+        "total_tokens": usage_tokens(usage),
+    }
+
+
+def _add_counts(entry: Dict[str, int], counts: Dict[str, int]):
+    for field in _USAGE_FIELDS:
+        entry[field] = entry.get(field, 0) + counts[field]
+
+
+def merge_usage(
+    stored: Optional[Dict[str, Dict[str, int]]], usage: Dict[str, "Usage"]
+) -> Dict[str, Dict[str, int]]:
+    """Add per-stage usage to a persisted {stage: counts} mapping, keeping a running "total" entry"""
+    merged = {stage: dict(counts) for stage, counts in (stored or {}).items()}
+    for stage, stage_usage in usage.items():
+        counts = usage_to_dict(stage_usage)
+        for key in (stage, "total"):
+            _add_counts(merged.setdefault(key, dict.fromkeys(_USAGE_FIELDS, 0)), counts)
+    return merged
+
+
+class RunBudget:
+    """Token accounting and ceiling for one enrichment run.
+
+    Per-stage totals are kept per process; the run-wide token count lives in
+    shared memory so worker processes started from the same context draw down
+    one ceiling. Tokens are charged as each agent call finishes, and every call
+    runs under a UsageLimits sized to the budget still remaining, so a call
+    that would go past the ceiling is stopped after its next model response.
+    The mode steps from NORMAL to ECONOMY, CONSERVE and PAUSED as spend
+    crosses the configured fractions of max_tokens.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        economy_at: float = 0.7,
+        conserve_at: float = 0.9,
+        low_value_verticals: Iterable[str] = LOW_VALUE_VERTICALS,
+        context: Optional[multiprocessing.context.BaseContext] = None,
+    ):
+        if max_tokens is not None and max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        ctx = context or multiprocessing.get_context()
+        self.max_tokens = max_tokens
+        self.economy_at = economy_at
+        self.conserve_at = conserve_at
+        self.low_value_verticals = frozenset(low_value_verticals)
+        self._spent = ctx.Value("q", 0)
+        self.stage_totals: Dict[str, Dict[str, int]] = {stage: dict.fromkeys(_USAGE_FIELDS, 0) for stage in STAGES}
+        self.companies = 0
+        # Spend on companies that ended without a result (failed, or nothing found)
+        self.no_result_totals: Dict[str, int] = dict.fromkeys(_USAGE_FIELDS, 0)
+        self.companies_without_result = 0
+
+    @property
+    def tokens_spent(self) -> int:
+        return self._spent.value
+
+    @property
+    def mode(self) -> BudgetMode:
+        if self.max_tokens is None:
+            return BudgetMode.NORMAL
+        fraction = self.tokens_spent / self.max_tokens
+        if fraction >= 1.0:
+            return BudgetMode.PAUSED
+        if fraction >= self.conserve_at:
+            return BudgetMode.CONSERVE
+        if fraction >= self.economy_at:
+            return BudgetMode.ECONOMY
+        return BudgetMode.NORMAL
+
+    @property
+    def tokens_remaining(self) -> Optional[int]:
+        if self.max_tokens is None:
+            return None
+        return max(self.max_tokens - self.tokens_spent, 0)
+
+    def usage_limits(self, stage_usage: "Usage") -> Optional["UsageLimits"]:
+        """Limits for an agent call accumulating into stage_usage, capped at the remaining run budget"""
+        if self.max_tokens is None:
+            return None
+        from pydantic_ai.usage import UsageLimits
+
+        # pydantic-ai checks the limit against the cumulative usage it is given, not just this call
+        return UsageLimits(total_tokens_limit=usage_tokens(stage_usage) + self.tokens_remaining)
+
+    def charge(self, tokens: int):
+        """Add tokens spent by a finished agent call to the run-wide count"""
+        with self._spent.get_lock():
+            self._spent.value += tokens
+
+    def record(self, usage: Dict[str, "Usage"], produced_result: bool = True):
+        """Add one company's per-stage usage to the per-stage totals; tokens are charged per call"""
+        for stage, stage_usage in usage.items():
+            counts = usage_to_dict(stage_usage)
+            _add_counts(self.stage_totals[stage], counts)
+            if not produced_result:
+                _add_counts(self.no_result_totals, counts)
+        self.companies += 1
+        if not produced_result:
+            self.companies_without_result += 1
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Per-stage usage for this process, spend without a result, and the run-wide token count"""
+        summary = {stage: dict(counts) for stage, counts in self.stage_totals.items()}
+        summary["no_result"] = {"companies": self.companies_without_result, **self.no_result_totals}
+        summary["run"] = {"companies": self.companies, "total_tokens": self.tokens_spent}
+        return summary
+
+
+def combine_summaries(summaries: Iterable[Dict[str, Dict[str, int]]], tokens_spent: int) -> Dict[str, Dict[str, int]]:
+    """Add up RunBudget summaries from several worker processes sharing one run-wide token count"""
+    combined: Dict[str, Dict[str, int]] = {}
+    for summary in summaries:
+        for key, counts in summary.items():
+            entry = combined.setdefault(key, {})
+            for field, value in counts.items():
+                entry[field] = entry.get(field, 0) + value
+    combined.setdefault("run", {"companies": 0})["total_tokens"] = tokens_spent
+    return combined
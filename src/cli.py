@@ -1,13 +1,26 @@
+import asyncio
 import os
+from functools import wraps
 from pathlib import Path
 
 import click
 from dotenv import load_dotenv
 
-from .main import RetailWarehouseScraper
-
 load_dotenv()
 
+# Heavy dependencies (pandas, pydantic_ai, SQLAlchemy, API clients) are imported
+# inside the commands so that `--help` and argument errors return immediately.
+
+
+def coro(f):
+    """Run an async click command on a fresh event loop"""
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        return asyncio.run(f(*args, **kwargs))
+
+    return wrapper
+
 
 @click.group()
 def cli():
@@ -19,28 +32,76 @@ def cli():
 @click.option("--input", "-i", type=click.Path(exists=True), required=True, help="Input CSV file")
 @click.option("--output", "-o", type=click.Path(), default="data/output/enriched_companies.csv", help="Output CSV file")
 @click.option("--batch-size", "-b", type=int, default=5, help="Batch size for processing")
-async def scrape(input, output, batch_size):
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=1, help="Number of worker processes")
+@click.option(
+    "--max-tokens",
+    type=click.IntRange(min=1),
+    envvar="MAX_RUN_TOKENS",
+    default=None,
+    help="LLM token ceiling for the run; cheaper modes kick in as it nears",
+)
+@coro
+async def scrape(input, output, batch_size, workers, max_tokens):
     """Scrape company information from web"""
+    if workers > 1:
+        from .runner import ShardWorkerError, run_sharded
+
+        try:
+            summary = run_sharded(
+                Path(input),
+                Path(output),
+                workers,
+                openai_api_key=os.getenv("OPENAI_API_KEY"),
+                firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY"),
+                requests_per_minute=int(os.getenv("REQUESTS_PER_MINUTE", "30")),
+                batch_size=batch_size,
+                max_tokens=max_tokens,
+            )
+        except ShardWorkerError as e:
+            raise click.ClickException(str(e))
+        _report(summary)
+        return
+
+    from .budget import RunBudget
+    from .main import RetailWarehouseScraper
+
     scraper = RetailWarehouseScraper(
-        openai_api_key=os.getenv("OPENAI_API_KEY"), firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY")
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY"),
+        budget=RunBudget(max_tokens),
     )
 
-    await scraper.process_csv(Path(input), Path(output))
+    _report(await scraper.process_csv(Path(input), Path(output), batch_size))
+
+
+def _report(summary):
+    """Print a run summary, calling out a run paused by the token ceiling"""
+    click.echo(
+        f"Processed {summary.processed} companies ({summary.failed} without a result) into {summary.output_path}"
+    )
+    if summary.skipped:
+        click.echo(f"Token ceiling reached: {summary.skipped} companies were skipped")
+    if summary.usage:
+        run, no_result = summary.usage["run"], summary.usage.get("no_result", {})
+        click.echo(
+            f"LLM tokens used: {run['total_tokens']} ({no_result.get('total_tokens', 0)} on companies without a result)"
+        )
 
 
 @cli.command()
 @click.option("--company", "-c", type=str, required=True, help="Company name to search")
 @click.option("--vertical", "-v", type=str, default="General", help="Business vertical")
+@coro
 async def search(company, vertical):
     """Search for a single company"""
-    from .database.connection import get_db_engine, get_db_session
+    from .database.connection import get_db_session
+    from .main import RetailWarehouseScraper
 
     scraper = RetailWarehouseScraper(
         openai_api_key=os.getenv("OPENAI_API_KEY"), firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY")
     )
 
-    engine = get_db_engine()
-    with get_db_session(engine) as session:
+    with get_db_session(scraper.engine) as session:
         result = await scraper.process_company(company, vertical, session)
         if result:
             click.echo(result.model_dump_json(indent=2))
@@ -48,5 +109,93 @@ async def search(company, vertical):
             click.echo(f"No data found for {company}")
 
 
+METRIC_CHOICES = click.Choice(["truck_count", "store_count", "facility_count", "warehouse_employee_count"])
+
+
+def filter_options(f):
+    """Options shared by query and export for filtering the companies table"""
+    options = [
+        click.option("--vertical", "-v", "verticals", multiple=True, help="Business vertical (repeatable)"),
+        click.option(
+            "--min",
+            "metric_min",
+            type=(METRIC_CHOICES, int),
+            multiple=True,
+            help="Metric lower bound, e.g. --min truck_count 100",
+        ),
+        click.option(
+            "--max",
+            "metric_max",
+            type=(METRIC_CHOICES, int),
+            multiple=True,
+            help="Metric upper bound, e.g. --max store_count 50",
+        ),
+        click.option(
+            "--min-confidence", type=click.FloatRange(0.0, 1.0), default=None, help="Minimum confidence score"
+        ),
+        click.option(
+            "--max-age-days", type=click.IntRange(min=0), default=None, help="Only records updated within N days"
+        ),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def _build_filter(verticals, metric_min, metric_max, min_confidence, max_age_days):
+    from .database.query import CompanyFilter
+
+    return CompanyFilter(
+        verticals=list(verticals),
+        metric_min=dict(metric_min),
+        metric_max=dict(metric_max),
+        min_confidence=min_confidence,
+        max_age_days=max_age_days,
+    )
+
+
+@cli.command()
+@filter_options
+@click.option("--limit", "-n", type=click.IntRange(min=1), default=20, help="Maximum rows to print")
+def query(verticals, metric_min, metric_max, min_confidence, max_age_days, limit):
+    """Query enriched companies from the database"""
+    import json
+
+    from .database.connection import get_db_engine, get_db_session, init_db
+    from .database.query import iter_companies
+
+    filters = _build_filter(verticals, metric_min, metric_max, min_confidence, max_age_days)
+    with get_db_session(init_db(get_db_engine())) as session:
+        for row in iter_companies(session, filters, limit=limit):
+            click.echo(json.dumps(row, default=str))
+
+
+@cli.command()
+@filter_options
+@click.option("--output", "-o", type=click.Path(), required=True, help="Output file")
+@click.option(
+    "--format",
+    "-f",
+    "fmt",
+    type=click.Choice(["csv", "jsonl", "parquet"]),
+    default=None,
+    help="Defaults to the file extension",
+)
+def export(verticals, metric_min, metric_max, min_confidence, max_age_days, output, fmt):
+    """Export enriched companies to CSV, JSONL or Parquet"""
+    from .database.connection import get_db_engine, get_db_session, init_db
+    from .database.export import EXPORT_FORMATS, export_companies
+
+    output_path = Path(output)
+    fmt = fmt or output_path.suffix.lstrip(".").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise click.BadParameter(f"cannot infer format from '{output_path.name}', use --format", param_hint="--format")
+
+    filters = _build_filter(verticals, metric_min, metric_max, min_confidence, max_age_days)
+    with get_db_session(init_db(get_db_engine())) as session:
+        count = export_companies(session, filters, output_path, fmt)
+    click.echo(f"Exported {count} companies to {output_path}")
+
+
 if __name__ == "__main__":
     cli()
@@ -3,7 +3,7 @@ from contextlib import contextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import Session, sessionmaker
 
 load_dotenv()
@@ -14,7 +14,42 @@ def get_db_engine(db_path: str = None):
     if db_path is None:
         db_path = os.getenv("DATABASE_PATH", "data/companies.db")
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    return create_engine(f"sqlite:///{db_path}", echo=False)
+    # Busy timeout so concurrent worker processes wait for the write lock instead of failing
+    engine = create_engine(f"sqlite:///{db_path}", echo=False, connect_args={"timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        # WAL lets readers proceed while another process writes
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    return engine
+
+
+def init_db(engine):
+    """Create missing tables and bring existing ones up to the current schema.
+
+    create_all never alters an existing table, so columns added since a
+    database was created are added with ALTER TABLE and missing indexes are
+    created. New columns are all nullable, so existing rows stay valid.
+    """
+    from ..models.database import Base
+
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            for index in table.indexes:
+                columns = ", ".join(column.name for column in index.columns)
+                unique = "UNIQUE " if index.unique else ""
+                conn.execute(text(f"CREATE {unique}INDEX IF NOT EXISTS {index.name} ON {table.name} ({columns})"))
+    return engine
 
 
 @contextmanager
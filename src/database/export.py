@@ -0,0 +1,101 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from .query import EXPORT_COLUMNS, CompanyFilter, iter_companies
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _serialize(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a row into plain scalar values"""
+    row = dict(row)
+    if isinstance(row["last_updated"], datetime):
+        row["last_updated"] = row["last_updated"].isoformat()
+    row["source_references"] = ", ".join(str(url) for url in row["source_references"] or [])
+    return row
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _write_csv(rows: Iterable[Dict[str, Any]], path: Path) -> int:
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_jsonl(rows: Iterable[Dict[str, Any]], path: Path) -> int:
+    count = 0
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def _write_parquet(rows: Iterable[Dict[str, Any]], path: Path, chunk_size: int) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow. Install with: uv pip install -e '.[parquet]'") from e
+
+    schema = pa.schema(
+        [
+            ("company_name", pa.string()),
+            ("cleaned_name", pa.string()),
+            ("vertical", pa.dictionary(pa.int8(), pa.string())),
+            ("truck_count", pa.int64()),
+            ("warehouse_employee_count", pa.int64()),
+            ("facility_count", pa.int64()),
+            ("store_count", pa.int64()),
+            ("confidence_score", pa.float64()),
+            ("last_updated", pa.string()),
+            ("notes", pa.string()),
+            ("source_references", pa.string()),
+        ]
+    )
+
+    # One row group per chunk so only chunk_size rows are materialized at a time
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def export_companies(
+    session: Session, filters: CompanyFilter, path: Path, fmt: str = "csv", chunk_size: int = 1000
+) -> int:
+    """Stream companies matching filters to a CSV, JSONL or Parquet file; returns rows written"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    rows = (_serialize(row) for row in iter_companies(session, filters, chunk_size=chunk_size))
+    if fmt == "csv":
+        count = _write_csv(rows, path)
+    elif fmt == "jsonl":
+        count = _write_jsonl(rows, path)
+    else:
+        count = _write_parquet(rows, path, chunk_size)
+
+    logger.info(f"Exported {count} companies to {path}")
+    return count
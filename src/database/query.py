@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from ..models.company import METRIC_FIELDS
+from ..models.database import Company
+
+# Columns returned by queries and exports, in output order
+EXPORT_COLUMNS = [
+    "company_name",
+    "cleaned_name",
+    "vertical",
+    "truck_count",
+    "warehouse_employee_count",
+    "facility_count",
+    "store_count",
+    "confidence_score",
+    "last_updated",
+    "notes",
+    "source_references",
+]
+
+
+class CompanyFilter(BaseModel):
+    """Filters over the companies table; every set field narrows the result"""
+
+    verticals: List[str] = Field(default_factory=list, description="Match any of these verticals")
+    metric_min: Dict[str, int] = Field(default_factory=dict, description="Inclusive lower bound per metric")
+    metric_max: Dict[str, int] = Field(default_factory=dict, description="Inclusive upper bound per metric")
+    min_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+    max_age_days: Optional[int] = Field(None, ge=0, description="Only records updated within this many days")
+
+    @field_validator("metric_min", "metric_max")
+    @classmethod
+    def _known_metrics(cls, bounds: Dict[str, int]) -> Dict[str, int]:
+        unknown = set(bounds) - set(METRIC_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+        return bounds
+
+
+def build_query(filters: CompanyFilter) -> Select:
+    """Build a column-only SELECT over companies; each filter hits an indexed column"""
+    stmt = select(*(getattr(Company, column) for column in EXPORT_COLUMNS))
+    if filters.verticals:
+        stmt = stmt.where(Company.vertical.in_(filters.verticals))
+    for metric, bound in filters.metric_min.items():
+        stmt = stmt.where(getattr(Company, metric) >= bound)
+    for metric, bound in filters.metric_max.items():
+        stmt = stmt.where(getattr(Company, metric) <= bound)
+    if filters.min_confidence is not None:
+        stmt = stmt.where(Company.confidence_score >= filters.min_confidence)
+    if filters.max_age_days is not None:
+        stmt = stmt.where(Company.last_updated >= datetime.now() - timedelta(days=filters.max_age_days))
+    return stmt.order_by(Company.id)
+
+
+def iter_companies(
+    session: Session, filters: CompanyFilter, limit: Optional[int] = None, chunk_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """Stream matching companies as dicts.
+
+    yield_per turns on stream_results, so rows are fetched from the cursor in
+    chunks of chunk_size rather than buffered, keeping memory flat on large tables.
+    """
+    stmt = build_query(filters)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = session.execute(stmt.execution_options(yield_per=chunk_size))
+    for row in result:
+        yield dict(row._mapping)
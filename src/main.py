@@ -1,137 +1,400 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import pandas as pd
 from sqlalchemy.orm import Session
 
-from .agents.analysis_agent import AnalysisAgent
-from .agents.research_agent import ResearchAgent
-from .agents.scraping_agent import ScrapingAgent
-from .database.connection import get_db_engine, get_db_session
-from .models.company import BusinessVertical, CompanyData, SearchQuery
-from .models.database import Base, Company
+from .budget import STAGES, BudgetMode, RunBudget, content_budget, max_urls, merge_usage, usage_tokens
+from .database.connection import get_db_engine, get_db_session, init_db
+from .models.company import METRIC_FIELDS, BusinessVertical, CompanyData, RunSummary, ScrapedData, SearchQuery
+from .models.database import Company
+from .refresh import cited_sources, mark_checked, plan_refresh, record_checks, record_metrics, tracked_sources
+from .result_buffer import ResultBuffer
+from .tools.entity_resolution import EntityIndex, clean_company_name, dedupe_companies, normalize_company_name
+from .tools.rate_limiter import SharedRateLimiter
+
+if TYPE_CHECKING:
+    from pydantic_ai.usage import Usage
+
+    from .agents.analysis_agent import AnalysisAgent
+    from .agents.research_agent import ResearchAgent
+    from .agents.scraping_agent import ScrapingAgent
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pause between batches, on top of the per-request rate limit
+BATCH_PAUSE_SECONDS = 2
 
-class RetailWarehouseScraper:
-    def __init__(self, openai_api_key: str, firecrawl_api_key: str):
-        self.research_agent = ResearchAgent(openai_api_key)
-        self.scraping_agent = ScrapingAgent(openai_api_key, firecrawl_api_key)
-        self.analysis_agent = AnalysisAgent(openai_api_key)
 
-        # Initialize database
-        self.engine = get_db_engine()
-        Base.metadata.create_all(self.engine)
+class RetailWarehouseScraper:
+    def __init__(
+        self,
+        openai_api_key: str,
+        firecrawl_api_key: str,
+        rate_limiter: Optional[SharedRateLimiter] = None,
+        budget: Optional[RunBudget] = None,
+    ):
+        self.openai_api_key = openai_api_key
+        self.firecrawl_api_key = firecrawl_api_key
+        self.rate_limiter = rate_limiter
+        self.budget = budget
+
+        # Built from the companies table on first lookup
+        self.entity_index: Optional[EntityIndex] = None
+
+    # Agents and the database engine are built on first use so that importing
+    # this module and constructing the scraper stay cheap.
+
+    @cached_property
+    def research_agent(self) -> "ResearchAgent":
+        from .agents.research_agent import ResearchAgent
+
+        return ResearchAgent(self.openai_api_key, rate_limiter=self.rate_limiter)
+
+    @cached_property
+    def scraping_agent(self) -> "ScrapingAgent":
+        from .agents.scraping_agent import ScrapingAgent
+
+        return ScrapingAgent(self.openai_api_key, self.firecrawl_api_key, rate_limiter=self.rate_limiter)
+
+    @cached_property
+    def analysis_agent(self) -> "AnalysisAgent":
+        from .agents.analysis_agent import AnalysisAgent
+
+        return AnalysisAgent(self.openai_api_key, rate_limiter=self.rate_limiter)
+
+    @cached_property
+    def engine(self):
+        return init_db(get_db_engine())
+
+    def _get_entity_index(self, session: Session) -> EntityIndex:
+        if self.entity_index is None:
+            self.entity_index = EntityIndex.from_session(session)
+        return self.entity_index
+
+    def _find_existing(self, company_name: str, session: Session) -> Optional[Company]:
+        """Resolve a raw company name to an existing record, if any"""
+        entity_id = self._get_entity_index(session).resolve(company_name)
+        if entity_id is None:
+            return None
+        return session.get(Company, entity_id)
 
     async def process_company(self, company_name: str, vertical: str, session: Session) -> Optional[CompanyData]:
         """Process a single company"""
+        existing = None
+        usage = None
+        result = None
         try:
             # Check if we have recent data
-            existing = session.query(Company).filter_by(company_name=company_name).first()
+            existing = self._find_existing(company_name, session)
             if existing and existing.last_updated > datetime.now() - timedelta(days=30):
                 logger.info(f"Using cached data for {company_name}")
                 return existing.to_pydantic()
 
-            logger.info(f"Processing {company_name}")
-
-            # Create search query
-            query = SearchQuery(company_name=company_name, vertical=BusinessVertical(vertical))
-
-            # Research phase
-            urls = await self.research_agent.research_company(query)
-            if not urls:
-                logger.warning(f"No URLs found for {company_name}")
+            # Near the token ceiling stale records are served as-is and low-value new companies are
+            # skipped; at the ceiling nothing new starts
+            mode = self.budget.mode if self.budget else BudgetMode.NORMAL
+            if mode == BudgetMode.PAUSED:
+                logger.warning(f"Token budget exhausted, skipping {company_name}")
                 return None
+            if mode == BudgetMode.CONSERVE:
+                if existing:
+                    logger.info(f"Token budget low, using stale data for {company_name}")
+                    return existing.to_pydantic()
+                if vertical in self.budget.low_value_verticals:
+                    logger.info(f"Token budget low, skipping low-value company {company_name}")
+                    return None
 
-            # Scraping phase
-            scraped_data = await self.scraping_agent.scrape_urls(urls[:3])  # Limit to top 3 URLs
-            if not scraped_data:
-                logger.warning(f"No data scraped for {company_name}")
-                return None
+            from pydantic_ai.usage import Usage
 
-            # Analysis phase
-            company_data = await self.analysis_agent.analyze_company_data(query, scraped_data)
+            usage = {stage: Usage() for stage in STAGES}
+            result = await self._enrich_company(company_name, vertical, existing, session, usage, mode)
+            return result
 
-            # Save to database
-            if existing:
-                # Update existing record
-                for key, value in company_data.model_dump(exclude={"last_updated"}).items():
-                    setattr(existing, key, value)
-                existing.last_updated = datetime.now()
-            else:
-                # Create new record
-                new_company = Company(**company_data.model_dump())
-                session.add(new_company)
+        except Exception as e:
+            logger.error(f"Error processing {company_name}: {str(e)}")
+            session.rollback()
+            return None
 
+        finally:
+            if usage is not None:
+                self._record_usage(company_name, existing, usage, result is not None, session)
+
+    def _record_usage(
+        self,
+        company_name: str,
+        existing: Optional[Company],
+        usage: Dict[str, "Usage"],
+        produced_result: bool,
+        session: Session,
+    ):
+        """Add a company's usage to the run, keeping spend that produced no result.
+
+        Successful runs persist usage with the record itself; for failed ones it
+        is merged into the existing record, if any, and counted in the run's
+        no_result totals.
+        """
+        if self.budget:
+            self.budget.record(usage, produced_result=produced_result)
+        tokens = sum(usage_tokens(stage_usage) for stage_usage in usage.values())
+        if produced_result or not tokens:
+            return
+
+        logger.warning(f"Spent {tokens} LLM tokens on {company_name} without a result")
+        if existing is not None:
+            try:
+                existing.llm_usage = merge_usage(existing.llm_usage, usage)
+                session.commit()
+            except Exception as e:
+                logger.error(f"Could not save LLM usage for {company_name}: {str(e)}")
+                session.rollback()
+
+    async def _call_agent(self, method: Callable[..., Awaitable[Any]], *args, usage: "Usage", **kwargs) -> Any:
+        """Call an agent method under the remaining token budget, charging what it spends to the run"""
+        if not self.budget:
+            return await method(*args, usage=usage, **kwargs)
+
+        before = usage_tokens(usage)
+        try:
+            return await method(*args, usage=usage, usage_limits=self.budget.usage_limits(usage), **kwargs)
+        finally:
+            self.budget.charge(usage_tokens(usage) - before)
+
+    async def _enrich_company(
+        self,
+        company_name: str,
+        vertical: str,
+        existing: Optional[Company],
+        session: Session,
+        usage: Dict[str, "Usage"],
+        mode: BudgetMode,
+    ) -> Optional[CompanyData]:
+        """Run the LLM pipeline for a company and save the result"""
+        # Create search query
+        query = SearchQuery(company_name=company_name, vertical=BusinessVertical(vertical))
+
+        # Stale records with per-metric provenance are refreshed incrementally
+        if existing and existing.metric_provenance:
+            logger.info(f"Refreshing {company_name}")
+            company_data = await self._refresh_company(existing, query, usage, mode)
             session.commit()
-            logger.info(f"Successfully processed {company_name}")
             return company_data
 
-        except Exception as e:
-            logger.error(f"Error processing {company_name}: {str(e)}")
-            session.rollback()
+        logger.info(f"Processing {company_name}")
+
+        # Research and scraping phases
+        scraped_data = await self._research_and_scrape(query, usage, mode)
+        if not scraped_data:
             return None
 
-    async def process_csv(self, input_path: Path, output_path: Path):
-        """Process companies from CSV file"""
-        # Read input CSV
-        df = pd.read_csv(input_path)
-
-        # Process companies in batches
-        batch_size = 5
-        results = []
-
-        with get_db_session(self.engine) as session:
-            for i in range(0, len(df), batch_size):
-                batch = df.iloc[i : i + batch_size]
-                tasks = []
-
-                for _, row in batch.iterrows():
-                    company_name = row["Company Name"]
-                    vertical = row.get("Vertical", "General")
-                    tasks.append(self.process_company(company_name, vertical, session))
-
-                batch_results = await asyncio.gather(*tasks)
-                results.extend([r for r in batch_results if r])
-
-                # Save intermediate results
-                if results:
-                    self._save_results(results, output_path)
-
-                # Rate limiting
-                await asyncio.sleep(2)
-
-        logger.info(f"Processed {len(results)} companies successfully")
-        return results
-
-    def _save_results(self, results: List[CompanyData], output_path: Path):
-        """Save results to CSV"""
-        data = []
-        for company in results:
-            data.append(
-                {
-                    "Company Name": company.company_name,
-                    "Cleaned Name": company.cleaned_name,
-                    "Vertical": company.vertical,
-                    "Truck Count": company.truck_count,
-                    "Warehouse Employee Count": company.warehouse_employee_count,
-                    "Facility Count": company.facility_count,
-                    "Store Count": company.store_count,
-                    "Notes": company.notes,
-                    "Source References": ", ".join([str(url) for url in company.source_references]),
-                    "Last Updated": company.last_updated.isoformat(),
-                    "Confidence Score": company.confidence_score,
-                }
+        # Analysis phase
+        company_data = await self._call_agent(
+            self.analysis_agent.analyze_company_data,
+            query,
+            scraped_data,
+            usage=usage["analysis"],
+            max_content_chars=content_budget(mode),
+        )
+        company_data.cleaned_name = clean_company_name(company_name)
+
+        # Fingerprint the cited sources so later refreshes can detect changes cheaply
+        now = datetime.now()
+        source_urls = cited_sources(company_data, scraped_data)
+        checks = await self._check_sources(source_urls, {})
+
+        # Save to database
+        if existing:
+            # Update existing record, keeping the stored name as the entity's canonical key
+            for key, value in company_data.model_dump(exclude={"company_name", "last_updated"}).items():
+                setattr(existing, key, value)
+            existing.last_updated = now
+            record = existing
+        else:
+            # Create new record
+            record = Company(**company_data.model_dump(), normalized_name=normalize_company_name(company_name))
+            session.add(record)
+
+        record_checks(record, checks, now)
+        record_metrics(record, {m: getattr(company_data, m) for m in METRIC_FIELDS}, source_urls, checks, now)
+        record.llm_usage = merge_usage(record.llm_usage, usage)
+        session.commit()
+
+        if not existing:
+            index = self._get_entity_index(session)
+            index.add(record.id, company_name)
+            index.add(record.id, company_data.company_name)
+
+        logger.info(f"Successfully processed {company_name}")
+        return company_data
+
+    async def _research_and_scrape(
+        self, query: SearchQuery, usage: Dict[str, "Usage"], mode: BudgetMode = BudgetMode.NORMAL
+    ) -> List[ScrapedData]:
+        """Run research and scraping phases for a company"""
+        urls = await self._call_agent(self.research_agent.research_company, query, usage=usage["research"])
+        if not urls:
+            logger.warning(f"No URLs found for {query.company_name}")
+            return []
+
+        scraped_data = await self._call_agent(
+            self.scraping_agent.scrape_urls, urls[: max_urls(mode)], usage=usage["scraping"]
+        )
+        if not scraped_data:
+            logger.warning(f"No data scraped for {query.company_name}")
+        return scraped_data
+
+    async def _check_sources(
+        self, urls: List[str], fingerprints: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Conditionally re-fetch source URLs; sources that fail are left out of the result"""
+        tasks = [
+            self.scraping_agent.firecrawl.check_source(
+                url,
+                etag=fingerprints.get(url, {}).get("etag"),
+                last_modified=fingerprints.get(url, {}).get("last_modified"),
+            )
+            for url in urls
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        checks = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Source check failed for {url}: {result}")
+                continue
+            checks[url] = result
+        return checks
+
+    async def _refresh_company(
+        self, existing: Company, query: SearchQuery, usage: Dict[str, "Usage"], mode: BudgetMode
+    ) -> CompanyData:
+        """Refresh only the metrics whose sources changed, researching only missing ones"""
+        now = datetime.now()
+        fingerprints = existing.source_fingerprints or {}
+        checks = await self._check_sources(tracked_sources(existing), fingerprints)
+        missing, stale, unchanged = plan_refresh(existing, checks, now)
+        logger.info(
+            f"{query.company_name}: {len(unchanged)} unchanged, {len(stale)} stale, {len(missing)} missing metrics"
+        )
+
+        scraped_data = []
+        if missing:
+            scraped_data.extend(await self._research_and_scrape(query, usage, mode))
+        if stale:
+            scraped_urls = {str(data.url) for data in scraped_data}
+            provenance = existing.metric_provenance or {}
+            changed_urls = sorted(
+                {url for metric in stale for url in provenance[metric]["sources"] if url not in scraped_urls}
             )
+            if changed_urls:
+                scraped_data.extend(
+                    await self._call_agent(self.scraping_agent.scrape_urls, changed_urls, usage=usage["scraping"])
+                )
+
+        if scraped_data:
+            company_data = await self._call_agent(
+                self.analysis_agent.analyze_company_data,
+                query,
+                scraped_data,
+                usage=usage["analysis"],
+                max_content_chars=content_budget(mode),
+            )
+            source_urls = cited_sources(company_data, scraped_data)
+            checks.update(await self._check_sources([url for url in source_urls if url not in checks], fingerprints))
+            record_checks(existing, checks, now)
+            record_metrics(
+                existing, {m: getattr(company_data, m) for m in missing + stale}, source_urls, checks, now
+            )
+            references = {str(url) for url in existing.source_references or []}
+            references.update(str(url) for url in company_data.source_references)
+            existing.source_references = sorted(references)
+        else:
+            record_checks(existing, checks, now)
+            # Research came up empty, so the missing metrics wait for the not-found retry interval
+            record_metrics(existing, dict.fromkeys(missing), [], checks, now)
+
+        mark_checked(existing, unchanged, now)
+        existing.llm_usage = merge_usage(existing.llm_usage, usage)
+        existing.last_updated = now
+        return existing.to_pydantic()
+
+    async def process_csv(self, input_path: Path, output_path: Path, batch_size: int = 5) -> RunSummary:
+        """Process companies from CSV file"""
+        companies = read_companies(input_path)
+        return await self.process_companies(companies, output_path, batch_size)
 
-        df = pd.DataFrame(data)
-        df.to_csv(output_path, index=False)
-        logger.info(f"Saved {len(data)} records to {output_path}")
+    async def process_companies(
+        self, companies: List[Tuple[str, str]], output_path: Path, batch_size: int = 5
+    ) -> RunSummary:
+        """Process (company_name, vertical) pairs in batches, streaming results to output_path.
+
+        Results reach the CSV in ResultBuffer chunks; every record is already
+        committed to the database as it is processed, and whatever is buffered
+        is flushed when the run ends, fails or is cancelled.
+        """
+        buffer = ResultBuffer(output_path)
+        summary = RunSummary(output_path=output_path)
+
+        try:
+            with get_db_session(self.engine) as session:
+                for i in range(0, len(companies), batch_size):
+                    batch = companies[i : i + batch_size]
+                    tasks = []
+
+                    for company_name, vertical in batch:
+                        tasks.append(self.process_company(company_name, vertical, session))
+
+                    batch_results = await asyncio.gather(*tasks)
+                    for result in batch_results:
+                        if result:
+                            buffer.append(result)
+                            summary.processed += 1
+                        else:
+                            summary.failed += 1
+
+                    # Pause the run once the token ceiling is reached
+                    if self.budget and self.budget.mode == BudgetMode.PAUSED:
+                        summary.skipped = len(companies) - (i + len(batch))
+                        logger.warning(f"Token budget exhausted, pausing with {summary.skipped} companies left")
+                        break
+
+                    # Rate limiting
+                    await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        finally:
+            # Also writes the header when there was nothing to process
+            buffer.flush()
+        if self.budget:
+            summary.usage = self.budget.summary()
+            logger.info(f"LLM usage: {summary.usage}")
+        logger.info(f"Processed {summary.processed} companies successfully")
+        return summary
+
+
+def read_companies(input_path: Path) -> List[Tuple[str, str]]:
+    """Read (company_name, vertical) pairs from the input CSV with duplicates collapsed"""
+    import pandas as pd
+
+    df = pd.read_csv(input_path)
+
+    rows = []
+    for position, row in df.iterrows():
+        company_name = row["Company Name"]
+        # Empty cells come through as NaN; skip them rather than failing the whole run
+        if not isinstance(company_name, str) or not company_name.strip():
+            logger.warning(f"Skipping input row {position}: missing company name")
+            continue
+        vertical = row.get("Vertical", "General")
+        rows.append((company_name.strip(), "General" if pd.isna(vertical) else vertical))
+
+    # Collapse rows naming the same company before any network work
+    companies = dedupe_companies(rows)
+    if len(companies) < len(rows):
+        logger.info(f"Collapsed {len(rows) - len(companies)} duplicate company rows")
+    return companies
 
 
 async def main():
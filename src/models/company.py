@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -21,6 +22,10 @@ class BusinessVertical(str, Enum):
     PAPER_OFFICE = "Paper & Office Products"
 
 
+# Operational metrics tracked and refreshed individually
+METRIC_FIELDS = ("truck_count", "store_count", "facility_count", "warehouse_employee_count")
+
+
 class CompanyData(BaseModel):
     """Structured company data model"""
 
@@ -52,3 +57,13 @@ class ScrapedData(BaseModel):
     content: str
     extracted_data: dict
     scrape_timestamp: datetime = Field(default_factory=datetime.now)
+
+
+class RunSummary(BaseModel):
+    """Outcome of a batch enrichment run"""
+
+    processed: int = 0
+    failed: int = 0
+    skipped: int = Field(0, description="Companies left unprocessed because the token budget ran out")
+    output_path: Path
+    usage: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="LLM usage per stage and run")
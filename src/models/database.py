@@ -11,16 +11,23 @@ class Company(Base):
 
     id = Column(Integer, primary_key=True)
     company_name = Column(String, unique=True, nullable=False)
+    normalized_name = Column(String, nullable=True, index=True)
     cleaned_name = Column(String, nullable=False)
-    vertical = Column(String, nullable=False)
-    truck_count = Column(Integer, nullable=True)
-    warehouse_employee_count = Column(Integer, nullable=True)
-    facility_count = Column(Integer, nullable=True)
-    store_count = Column(Integer, nullable=True)
+    vertical = Column(String, nullable=False, index=True)
+    truck_count = Column(Integer, nullable=True, index=True)
+    warehouse_employee_count = Column(Integer, nullable=True, index=True)
+    facility_count = Column(Integer, nullable=True, index=True)
+    store_count = Column(Integer, nullable=True, index=True)
     notes = Column(String, nullable=True)
     source_references = Column(JSON, default=list)
-    last_updated = Column(DateTime, default=datetime.now)
-    confidence_score = Column(Float, default=0.0)
+    last_updated = Column(DateTime, default=datetime.now, index=True)
+    confidence_score = Column(Float, default=0.0, index=True)
+    # Per-metric {"updated_at", "checked_at", "sources": {url: content_hash}}
+    metric_provenance = Column(JSON, default=dict)
+    # Per-source {"etag", "last_modified", "content_hash", "checked_at"} for conditional re-checks
+    source_fingerprints = Column(JSON, default=dict)
+    # Cumulative LLM usage per stage plus "total": {"requests", "request_tokens", "response_tokens", "total_tokens"}
+    llm_usage = Column(JSON, default=dict)
 
     def to_pydantic(self):
         """Convert SQLAlchemy model to Pydantic model"""
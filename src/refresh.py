@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models.company import METRIC_FIELDS, CompanyData, ScrapedData
+from .models.database import Company
+
+# Metrics that research could not find are only researched again after this long
+NOT_FOUND_RETRY_DAYS = 180
+
+
+def current_hash(url: str, checks: Dict[str, Dict[str, Any]], fingerprints: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Content hash of a source after a conditional check, or None if it could not be checked"""
+    check = checks.get(url)
+    if check is None:
+        return None
+    if check["not_modified"]:
+        return fingerprints.get(url, {}).get("content_hash")
+    return check["content_hash"]
+
+
+def cited_sources(company_data: CompanyData, scraped_data: List[ScrapedData]) -> List[str]:
+    """Scraped URLs the analysis cited, falling back to every scraped URL when it cited none of them"""
+    scraped = [str(data.url) for data in scraped_data]
+    cited = {str(url) for url in company_data.source_references}
+    return [url for url in scraped if url in cited] or scraped
+
+
+def _source_changed(current: Optional[str], recorded: Optional[str]) -> bool:
+    # An unverifiable source is treated as changed
+    return current is None or current != recorded
+
+
+def _recently_not_found(entry: Dict[str, Any], now: datetime) -> bool:
+    not_found_at = entry.get("not_found_at")
+    if not_found_at is None:
+        return False
+    return now - datetime.fromisoformat(not_found_at) < timedelta(days=NOT_FOUND_RETRY_DAYS)
+
+
+def plan_refresh(
+    record: Company, checks: Dict[str, Dict[str, Any]], now: Optional[datetime] = None
+) -> Tuple[List[str], List[str], List[str]]:
+    """Split metrics into (missing, stale, unchanged) for an existing record.
+
+    A metric is stale when any of its recorded sources now hashes differently
+    (or could not be checked); metrics without a value or without recorded
+    sources count as missing and need full research, unless research already
+    came up empty within NOT_FOUND_RETRY_DAYS, in which case they are left
+    unchanged.
+    """
+    now = now or datetime.now()
+    provenance = record.metric_provenance or {}
+    fingerprints = record.source_fingerprints or {}
+    missing, stale, unchanged = [], [], []
+    for metric in METRIC_FIELDS:
+        entry = provenance.get(metric, {})
+        sources = entry.get("sources", {})
+        if getattr(record, metric) is None and _recently_not_found(entry, now):
+            unchanged.append(metric)
+        elif getattr(record, metric) is None or not sources:
+            missing.append(metric)
+        elif any(_source_changed(current_hash(url, checks, fingerprints), digest) for url, digest in sources.items()):
+            stale.append(metric)
+        else:
+            unchanged.append(metric)
+    return missing, stale, unchanged
+
+
+def tracked_sources(record: Company) -> List[str]:
+    """Every source URL recorded against a metric that still has a value"""
+    provenance = record.metric_provenance or {}
+    urls = set()
+    for metric in METRIC_FIELDS:
+        if getattr(record, metric) is not None:
+            urls.update(provenance.get(metric, {}).get("sources", {}))
+    return sorted(urls)
+
+
+def record_checks(record: Company, checks: Dict[str, Dict[str, Any]], now: datetime):
+    """Store the validators and content hashes from conditional checks on the record"""
+    fingerprints = dict(record.source_fingerprints or {})
+    for url, check in checks.items():
+        fingerprints[url] = {
+            "etag": check["etag"],
+            "last_modified": check["last_modified"],
+            "content_hash": current_hash(url, checks, fingerprints),
+            "checked_at": now.isoformat(),
+        }
+    record.source_fingerprints = fingerprints
+
+
+def record_metrics(
+    record: Company,
+    values: Dict[str, Optional[int]],
+    sources: Iterable[str],
+    checks: Dict[str, Dict[str, Any]],
+    now: datetime,
+):
+    """Write refreshed metric values and tie each one to the sources it was derived from.
+
+    A None value keeps any previous value, tied to the current source hashes so
+    it isn't re-scraped on every refresh; a metric that never had a value is
+    marked as researched but not found.
+    """
+    fingerprints = record.source_fingerprints or {}
+    source_hashes = {url: current_hash(url, checks, fingerprints) for url in sources}
+    provenance = dict(record.metric_provenance or {})
+    for metric, value in values.items():
+        if value is None:
+            if getattr(record, metric) is None:
+                entry = {"not_found_at": now.isoformat(), "sources": {}}
+            else:
+                entry = {**provenance.get(metric, {}), "sources": source_hashes}
+            provenance[metric] = {**entry, "checked_at": now.isoformat()}
+            continue
+        setattr(record, metric, value)
+        provenance[metric] = {
+            "updated_at": now.isoformat(),
+            "checked_at": now.isoformat(),
+            "sources": source_hashes,
+        }
+    record.metric_provenance = provenance
+
+
+def mark_checked(record: Company, metrics: Iterable[str], now: datetime):
+    """Bump checked_at for metrics whose sources were confirmed unchanged"""
+    provenance = dict(record.metric_provenance or {})
+    for metric in metrics:
+        if metric in provenance:
+            provenance[metric] = {**provenance[metric], "checked_at": now.isoformat()}
+    record.metric_provenance = provenance
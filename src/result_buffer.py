@@ -0,0 +1,115 @@
+import csv
+import logging
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .models.company import BusinessVertical, CompanyData
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = [
+    "Company Name",
+    "Cleaned Name",
+    "Vertical",
+    "Truck Count",
+    "Warehouse Employee Count",
+    "Facility Count",
+    "Store Count",
+    "Notes",
+    "Source References",
+    "Last Updated",
+    "Confidence Score",
+]
+
+# Count columns are stored as signed 64-bit ints; this value stands in for None
+_NULL = -(2**63)
+
+_COUNT_FIELDS = ("truck_count", "warehouse_employee_count", "facility_count", "store_count")
+
+
+class ResultBuffer:
+    """Columnar buffer of enriched companies, flushed to the output CSV in chunks.
+
+    Counts, timestamps and scores live in typed arrays, verticals are stored as
+    codes into a small category table and source URLs are kept as one joined
+    string, so a row costs a few dozen bytes plus its strings instead of a full
+    CompanyData model. Rows are appended to the CSV and dropped once a chunk
+    fills up or flush() is called.
+    """
+
+    def __init__(self, output_path: Path, chunk_size: int = 500):
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+
+        self._verticals: List[str] = [v.value for v in BusinessVertical]
+        self._vertical_codes: Dict[str, int] = {v: i for i, v in enumerate(self._verticals)}
+        self._reset()
+
+    def _reset(self):
+        self._names: List[str] = []
+        self._cleaned_names: List[str] = []
+        self._vertical_col = array("B")
+        self._counts = {field: array("q") for field in _COUNT_FIELDS}
+        self._notes: List[Optional[str]] = []
+        self._sources: List[str] = []
+        self._last_updated = array("d")
+        self._confidence = array("f")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _vertical_code(self, vertical) -> int:
+        value = BusinessVertical(vertical).value
+        return self._vertical_codes[value]
+
+    def append(self, company: CompanyData):
+        """Add a company to the buffer, flushing once the chunk is full"""
+        self._names.append(company.company_name)
+        self._cleaned_names.append(company.cleaned_name)
+        self._vertical_col.append(self._vertical_code(company.vertical))
+        for field in _COUNT_FIELDS:
+            value = getattr(company, field)
+            self._counts[field].append(_NULL if value is None else value)
+        self._notes.append(company.notes)
+        self._sources.append(", ".join(str(url) for url in company.source_references))
+        self._last_updated.append(company.last_updated.timestamp())
+        self._confidence.append(company.confidence_score)
+
+        if len(self) >= self.chunk_size:
+            self.flush()
+
+    def rows(self) -> Iterator[List]:
+        """Yield buffered rows in output column order"""
+        for i in range(len(self)):
+            counts = [self._counts[field][i] for field in _COUNT_FIELDS]
+            yield [
+                self._names[i],
+                self._cleaned_names[i],
+                self._verticals[self._vertical_col[i]],
+                *[None if count == _NULL else count for count in counts],
+                self._notes[i],
+                self._sources[i],
+                datetime.fromtimestamp(self._last_updated[i]).isoformat(),
+                round(self._confidence[i], 6),
+            ]
+
+    def flush(self):
+        """Append buffered rows to the output CSV and release them"""
+        if not self._names and self.rows_written:
+            return
+
+        # The first flush replaces any previous output; later ones append
+        mode = "a" if self.rows_written else "w"
+        with open(self.output_path, mode, newline="") as f:
+            writer = csv.writer(f)
+            if not self.rows_written:
+                writer.writerow(OUTPUT_COLUMNS)
+            writer.writerows(self.rows())
+
+        flushed = len(self)
+        self.rows_written += flushed
+        self._reset()
+        logger.info(f"Saved {flushed} records to {self.output_path} ({self.rows_written} total)")
@@ -0,0 +1,188 @@
+import asyncio
+import csv
+import logging
+import multiprocessing
+import queue
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .budget import RunBudget, combine_summaries
+from .database.connection import get_db_engine, init_db
+from .main import RetailWarehouseScraper, read_companies
+from .models.company import RunSummary
+from .tools.entity_resolution import normalize_company_name
+from .tools.rate_limiter import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class ShardWorkerError(RuntimeError):
+    """Raised after merging when one or more worker processes exited abnormally"""
+
+    def __init__(self, shards: List[int], companies: int, merged_rows: int):
+        self.shards = shards
+        self.companies = companies
+        self.merged_rows = merged_rows
+        super().__init__(
+            f"Workers for shards {', '.join(map(str, shards))} failed; up to {companies} companies from those "
+            f"shards may be missing from the output ({merged_rows} rows merged)"
+        )
+
+
+def shard_for(company_name: str, workers: int) -> int:
+    """Stable shard index for a company; name variants land in the same shard"""
+    return zlib.crc32(normalize_company_name(company_name).encode("utf-8")) % workers
+
+
+def shard_companies(companies: List[Tuple[str, str]], workers: int) -> List[List[Tuple[str, str]]]:
+    """Split (company_name, vertical) pairs into one list per worker"""
+    shards = [[] for _ in range(workers)]
+    for company_name, vertical in companies:
+        shards[shard_for(company_name, workers)].append((company_name, vertical))
+    return shards
+
+
+def _shard_output_path(output_path: Path, shard_index: int) -> Path:
+    return output_path.with_name(f"{output_path.stem}.part{shard_index}{output_path.suffix}")
+
+
+def _merge_shards(part_paths: List[Path], output_path: Path) -> int:
+    """Concatenate shard CSVs into output_path, keeping the first header; returns data rows written.
+
+    Rows are copied as text, so values come out exactly as the workers wrote
+    them and only one row is held in memory at a time.
+    """
+    rows = 0
+    with open(output_path, "w", newline="") as out:
+        writer = csv.writer(out)
+        header_written = False
+        for part_path in part_paths:
+            with open(part_path, newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                if not header_written:
+                    writer.writerow(header)
+                    header_written = True
+                for row in reader:
+                    writer.writerow(row)
+                    rows += 1
+    return rows
+
+
+def _run_worker(
+    shard_index: int,
+    companies: List[Tuple[str, str]],
+    output_path: Path,
+    openai_api_key: str,
+    firecrawl_api_key: str,
+    rate_limiter: SharedRateLimiter,
+    budget: RunBudget,
+    batch_size: int,
+    summaries: multiprocessing.Queue,
+):
+    """Worker process entry point: run a full async pipeline over one shard and report its summary"""
+    scraper = RetailWarehouseScraper(openai_api_key, firecrawl_api_key, rate_limiter=rate_limiter, budget=budget)
+    logger.info(f"Worker {shard_index} processing {len(companies)} companies")
+    summary = asyncio.run(scraper.process_companies(companies, output_path, batch_size))
+    summaries.put(summary)
+
+
+def _combine_run_summaries(summaries: List[RunSummary], output_path: Path, tokens_spent: int) -> RunSummary:
+    return RunSummary(
+        processed=sum(summary.processed for summary in summaries),
+        failed=sum(summary.failed for summary in summaries),
+        skipped=sum(summary.skipped for summary in summaries),
+        output_path=output_path,
+        usage=combine_summaries((summary.usage for summary in summaries), tokens_spent),
+    )
+
+
+def run_sharded(
+    input_path: Path,
+    output_path: Path,
+    workers: int,
+    openai_api_key: str,
+    firecrawl_api_key: str,
+    requests_per_minute: int = 30,
+    batch_size: int = 5,
+    max_tokens: Optional[int] = None,
+) -> RunSummary:
+    """Process the input CSV across worker processes and merge their output.
+
+    Companies are sharded by a hash of their normalized name, each worker runs
+    its own event loop, and all workers draw from one shared rate-limit budget
+    and one shared token ceiling.
+    Returns the workers' summaries combined into one RunSummary, or raises
+    ShardWorkerError after merging if any worker exited with a nonzero code.
+    """
+    companies = read_companies(input_path)
+    shards = shard_companies(companies, workers)
+
+    # Create and migrate tables once up front so workers don't race on DDL
+    init_db(get_db_engine())
+
+    ctx = multiprocessing.get_context("spawn")
+    rate_limiter = SharedRateLimiter(requests_per_minute, context=ctx)
+    budget = RunBudget(max_tokens, context=ctx)
+    summaries = ctx.Queue()
+
+    processes = []
+    for shard_index, shard in enumerate(shards):
+        if not shard:
+            continue
+        process = ctx.Process(
+            target=_run_worker,
+            args=(
+                shard_index,
+                shard,
+                _shard_output_path(output_path, shard_index),
+                openai_api_key,
+                firecrawl_api_key,
+                rate_limiter,
+                budget,
+                batch_size,
+                summaries,
+            ),
+            name=f"scraper-worker-{shard_index}",
+        )
+        process.start()
+        processes.append((shard_index, process))
+
+    failed_shards = []
+    for shard_index, process in processes:
+        process.join()
+        if process.exitcode != 0:
+            logger.error(f"Worker {shard_index} exited with code {process.exitcode}")
+            failed_shards.append(shard_index)
+
+    # Summaries are small and every worker has exited, so they are already in the pipe
+    worker_summaries = []
+    while True:
+        try:
+            worker_summaries.append(summaries.get_nowait())
+        except queue.Empty:
+            break
+    summary = _combine_run_summaries(worker_summaries, output_path, budget.tokens_spent)
+    logger.info(f"LLM usage: {summary.usage}")
+    if summary.skipped:
+        logger.warning(f"Token budget exhausted, {summary.skipped} companies were skipped")
+
+    # Merge shard outputs into a single CSV; a failed worker may still have flushed partial results
+    part_paths = [_shard_output_path(output_path, shard_index) for shard_index, _ in processes]
+    part_paths = [part_path for part_path in part_paths if part_path.exists()]
+
+    merged_rows = 0
+    if part_paths:
+        merged_rows = _merge_shards(part_paths, output_path)
+        for part_path in part_paths:
+            part_path.unlink()
+        logger.info(f"Merged {merged_rows} records from {len(part_paths)} workers into {output_path}")
+    else:
+        logger.warning("No results produced by any worker")
+
+    if failed_shards:
+        raise ShardWorkerError(failed_shards, sum(len(shards[i]) for i in failed_shards), merged_rows)
+    return summary
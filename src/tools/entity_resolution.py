@@ -0,0 +1,247 @@
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.database import Company
+
+logger = logging.getLogger(__name__)
+
+# Legal/corporate suffixes stripped from the end of a name (already lowercased, punctuation removed)
+LEGAL_SUFFIXES = {
+    "inc",
+    "incorporated",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "companies",
+    "llc",
+    "llp",
+    "lp",
+    "ltd",
+    "limited",
+    "plc",
+    "pllc",
+    "gmbh",
+    "ag",
+    "sa",
+    "nv",
+    "bv",
+    "pty",
+    "holdings",
+    "holding",
+    "group",
+}
+
+# Common industry words that don't identify a company on their own
+GENERIC_TOKENS = {
+    "and",
+    "of",
+    "american",
+    "america",
+    "brands",
+    "distribution",
+    "distributors",
+    "enterprises",
+    "food",
+    "foods",
+    "global",
+    "grocery",
+    "industries",
+    "international",
+    "logistics",
+    "market",
+    "markets",
+    "national",
+    "paper",
+    "products",
+    "retail",
+    "service",
+    "services",
+    "store",
+    "stores",
+    "supply",
+    "systems",
+    "transport",
+    "transportation",
+    "trucking",
+    "usa",
+    "wholesale",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s&]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def _tokens(name: str) -> List[str]:
+    """Split a raw name into lowercase tokens with punctuation removed and '&' spelled out"""
+    text = _strip_accents(name).lower()
+    text = text.replace("&", " and ")
+    # Drop dots inside abbreviations first so "Inc." and "L.L.C." collapse to single tokens
+    text = text.replace(".", "")
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip().split(" ") if text.strip() else []
+
+
+def _strip_suffixes(tokens: List[str]) -> List[str]:
+    """Remove trailing legal suffixes and a leading 'the', keeping at least one token"""
+    tokens = list(tokens)
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES | {"and"}:
+        tokens.pop()
+    return tokens
+
+
+def normalize_company_name(name: str) -> str:
+    """Deterministic match key for a company name.
+
+    Case, accents, punctuation, legal suffixes and '&'/'and' differences are
+    removed, so "Sysco Corp", "SYSCO Corporation" and "Sysco" share one key.
+    """
+    return " ".join(_strip_suffixes(_tokens(name)))
+
+
+def clean_company_name(name: str) -> str:
+    """Human-readable cleaned name: original casing kept, legal suffixes removed"""
+    words = _WHITESPACE.sub(" ", name).strip().split(" ")
+    while len(words) > 1 and normalize_company_name(words[-1]) in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words).rstrip(",. ")
+
+
+def _block_key(tokens: List[str]) -> Tuple[int, str]:
+    """Blocking key: token count and the first characters of the first token"""
+    return len(tokens), tokens[0][:2]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if b is a single insertion, deletion, substitution or adjacent swap away from a"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    # Adjacent transposition, e.g. "wlamart" / "walmart"
+    return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2 :] == b[i + 2 :]
+
+
+def _tokens_equivalent(a: str, b: str) -> bool:
+    """Plural forms or a one-character typo in a longer word; tokens with digits must match exactly"""
+    if any(c.isdigit() for c in a + b):
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    if longer in (shorter + "s", shorter + "es"):
+        return True
+    return len(shorter) >= 5 and _within_one_edit(a, b)
+
+
+def names_match(a: List[str], b: List[str]) -> bool:
+    """Token-by-token comparison allowing at most one nearly-identical token.
+
+    Distinct words never match, so "Northeast Grocery" and "Northwest Grocery"
+    or "Penske Truck Leasing" and "Penske Truck Leasing UK" stay separate. The
+    names must also share a distinctive token exactly, so a typo-sized
+    difference in the only distinctive word ("Kroger" / "Kruger Paper") is
+    treated as a different company.
+    """
+    if len(a) != len(b):
+        return False
+    differences = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    if len(differences) != 1:
+        return False
+    i = differences[0]
+    if not any(token not in GENERIC_TOKENS for j, token in enumerate(a) if j != i):
+        return False
+    return _tokens_equivalent(a[i], b[i])
+
+
+class EntityIndex:
+    """In-memory index resolving company names to entity ids.
+
+    Exact matches on the normalized key (or the key with spaces removed, so
+    "Wal-Mart" finds "Walmart") are tried first. Otherwise candidates sharing a
+    blocking key are compared token by token, so each lookup only checks a
+    handful of names instead of the whole table.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, int] = {}
+        self._by_compact: Dict[str, int] = {}
+        self._blocks: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    @classmethod
+    def from_session(cls, session: Session) -> "EntityIndex":
+        """Build an index over every row of the companies table.
+
+        Both the input name (stored normalized) and the name the analysis
+        returned are indexed, matching what a live run adds for new records.
+        """
+        index = cls()
+        rows = session.query(Company.id, Company.company_name, Company.normalized_name).all()
+        for row in rows:
+            if row.normalized_name:
+                index.add(row.id, row.normalized_name)
+            index.add(row.id, row.company_name)
+        return index
+
+    def add(self, entity_id: int, name: str) -> str:
+        """Register a name for an entity and return its normalized key"""
+        key = normalize_company_name(name)
+        if key:
+            self._by_key.setdefault(key, entity_id)
+            self._by_compact.setdefault(key.replace(" ", ""), entity_id)
+            self._blocks[_block_key(key.split(" "))].add(key)
+        return key
+
+    def add_many(self, entries: Iterable[Tuple[int, str]]):
+        for entity_id, name in entries:
+            self.add(entity_id, name)
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Return the entity id matching name, or None if it is a new entity"""
+        key = normalize_company_name(name)
+        if not key:
+            return None
+        if key in self._by_key:
+            return self._by_key[key]
+        compact = key.replace(" ", "")
+        if compact in self._by_compact:
+            return self._by_compact[compact]
+
+        tokens = key.split(" ")
+        for candidate in sorted(self._blocks.get(_block_key(tokens), ())):
+            if names_match(tokens, candidate.split(" ")):
+                return self._by_key[candidate]
+        return None
+
+
+def dedupe_companies(rows: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Collapse (company_name, vertical) rows that resolve to the same entity, keeping the first"""
+    index = EntityIndex()
+    unique = []
+    for company_name, vertical in rows:
+        match = index.resolve(company_name)
+        if match is not None:
+            logger.info(f"Collapsed duplicate input row {company_name!r} into {unique[match][0]!r}")
+            continue
+        index.add(len(unique), company_name)
+        unique.append((company_name, vertical))
+    return unique
@@ -1,18 +1,27 @@
 import asyncio
+import hashlib
 from functools import partial
 from typing import Any, Dict, Optional
 
 import httpx
 from firecrawl import FirecrawlApp
 
+from .rate_limiter import SharedRateLimiter
+
 
 class FirecrawlClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, rate_limiter: Optional[SharedRateLimiter] = None):
         self.app = FirecrawlApp(api_key=api_key) if api_key else None
         self.client = httpx.AsyncClient(timeout=30.0)
+        self.rate_limiter = rate_limiter
+
+    async def _throttle(self):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
 
     async def scrape(self, url: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Scrape a URL using Firecrawl"""
+        await self._throttle()
         if self.app:
             loop = asyncio.get_event_loop()
             scrape_func = partial(self.app.scrape_url, url, params=params)
@@ -22,8 +31,42 @@ class FirecrawlClient:
             response = await self.client.get(url)
             return {"content": response.text, "url": url, "status_code": response.status_code}
 
+    async def check_source(
+        self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Conditionally fetch a URL and fingerprint its content.
+
+        Sends If-None-Match/If-Modified-Since when validators are known; a 304
+        response is reported as not_modified without a new content hash.
+        """
+        await self._throttle()
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        response = await self.client.get(url, headers=headers, follow_redirects=True)
+        if response.status_code == 304:
+            return {
+                "url": url,
+                "not_modified": True,
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_hash": None,
+            }
+        response.raise_for_status()
+        return {
+            "url": url,
+            "not_modified": False,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": hashlib.sha256(response.content).hexdigest(),
+        }
+
     async def search(self, query: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Search using Firecrawl"""
+        await self._throttle()
         if self.app:
             loop = asyncio.get_event_loop()
             search_func = partial(self.app.search, query, params=params)
@@ -0,0 +1,36 @@
+import asyncio
+import multiprocessing
+import time
+from typing import Optional
+
+
+class SharedRateLimiter:
+    """Rate limiter whose budget is shared by every process it is passed to.
+
+    State is a single "next free slot" timestamp in shared memory guarded by a
+    process-safe lock, so N worker processes together stay within
+    requests_per_minute instead of each getting the full budget. The search,
+    Firecrawl/HTTP clients and agents acquire a slot before every outbound
+    request, so the budget counts requests rather than companies.
+    """
+
+    def __init__(self, requests_per_minute: int, context: Optional[multiprocessing.context.BaseContext] = None):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        ctx = context or multiprocessing.get_context()
+        self.interval = 60.0 / requests_per_minute
+        self._lock = ctx.Lock()
+        self._next_slot = ctx.Value("d", 0.0, lock=False)
+
+    def _reserve(self) -> float:
+        """Claim the next free slot and return how long to wait for it"""
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        return slot - now
+
+    async def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
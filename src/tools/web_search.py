@@ -6,12 +6,19 @@ from typing import Dict, List, Optional
 import httpx
 from tavily import TavilyClient
 
+from .rate_limiter import SharedRateLimiter
+
 
 class WebSearchTool:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, rate_limiter: Optional[SharedRateLimiter] = None):
         self.api_key = api_key or os.getenv("TAVILY_API_KEY")
         self.client = TavilyClient(api_key=self.api_key) if self.api_key else None
         self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.rate_limiter = rate_limiter
+
+    async def _throttle(self):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
 
     async def search_company_info(self, query: str, max_results: int = 10) -> List[Dict[str, str]]:
         """Search for company information using Tavily API"""
@@ -19,6 +26,7 @@ class WebSearchTool:
             raise ValueError("Tavily API key not provided")
 
         try:
+            await self._throttle()
             # Tavily search is synchronous, so we run it in executor
             loop = asyncio.get_event_loop()
             search_func = partial(
@@ -69,6 +77,7 @@ class WebSearchTool:
         try:
             from bs4 import BeautifulSoup
 
+            await self._throttle()
             # DuckDuckGo HTML search
             params = {"q": query, "t": "h_", "ia": "web"}
 
@@ -8,3 +8,17 @@ def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    """Scraper backed by a temporary database, with no pause between batches.
+
+    Tests assign fake research_agent / scraping_agent / analysis_agent objects,
+    which take the place of the lazily built real agents.
+    """
+    from src.main import RetailWarehouseScraper
+
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "companies.db"))
+    monkeypatch.setattr("src.main.BATCH_PAUSE_SECONDS", 0)
+    return RetailWarehouseScraper("test", "test")
@@ -9,7 +9,7 @@ from retail_warehouse_scraper.src.models.company import BusinessVertical, Scrape
 @pytest.mark.asyncio
 async def test_research_agent_research_company(monkeypatch):
     agent = ResearchAgent(api_key="test")
-    async def mock_run(query, deps=None):
+    async def mock_run(query, deps=None, usage=None, usage_limits=None):
         class Result:
             data = ["https://example.com"]
         return Result()
@@ -21,7 +21,7 @@ async def test_research_agent_research_company(monkeypatch):
 @pytest.mark.asyncio
 async def test_scraping_agent_scrape_urls(monkeypatch):
     agent = ScrapingAgent(api_key="test", firecrawl_api_key="test")
-    async def mock_run(url):
+    async def mock_run(url, usage=None, usage_limits=None):
         class Result:
             data = ScrapedData(url="https://example.com", content="Test", extracted_data={}, scrape_timestamp=None)
         return Result()
@@ -32,7 +32,7 @@ async def test_scraping_agent_scrape_urls(monkeypatch):
 @pytest.mark.asyncio
 async def test_analysis_agent_analyze_company_data(monkeypatch):
     agent = AnalysisAgent(api_key="test")
-    async def mock_run(content, deps=None):
+    async def mock_run(content, deps=None, usage=None, usage_limits=None):
         class Result:
             class Data:
                 company_name = "Test Company"
@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pydantic_ai.exceptions import UsageLimitExceeded
+from pydantic_ai.usage import Usage
+
+from src.budget import BudgetMode, RunBudget, combine_summaries, content_budget, max_urls, merge_usage
+from src.database.connection import get_db_session
+from src.models.company import CompanyData, ScrapedData, SearchQuery
+from src.models.database import Company
+
+
+def _usage(tokens):
+    return Usage(requests=1, request_tokens=tokens - 10, response_tokens=10, total_tokens=tokens)
+
+
+def _use_fake_agents(scraper, research_tokens, analysis_tokens, researched=None):
+    """Fake agents that spend fixed tokens and enforce usage_limits the way pydantic-ai does"""
+
+    async def research_company(query, usage=None, usage_limits=None):
+        if researched is not None:
+            researched.append(query.company_name)
+        usage.incr(_usage(research_tokens))
+        if usage_limits:
+            usage_limits.check_tokens(usage)
+        return [f"https://{query.company_name.lower().replace(' ', '')}.com"]
+
+    async def scrape_urls(urls, usage=None, usage_limits=None):
+        return [ScrapedData(url=url, content="10 trucks", extracted_data={}) for url in urls]
+
+    async def analyze_company_data(query, scraped_data, usage=None, max_content_chars=None, usage_limits=None):
+        usage.incr(_usage(analysis_tokens))
+        if usage_limits:
+            usage_limits.check_tokens(usage)
+        return CompanyData(company_name=query.company_name, cleaned_name=query.company_name, vertical=query.vertical)
+
+    async def check_source(url, etag=None, last_modified=None):
+        return {"url": url, "not_modified": False, "etag": None, "last_modified": None, "content_hash": "h"}
+
+    scraper.research_agent = SimpleNamespace(research_company=research_company)
+    scraper.scraping_agent = SimpleNamespace(
+        firecrawl=SimpleNamespace(check_source=check_source), scrape_urls=scrape_urls
+    )
+    scraper.analysis_agent = SimpleNamespace(analyze_company_data=analyze_company_data)
+
+
+def test_run_budget_steps_through_modes():
+    budget = RunBudget(max_tokens=1000)
+    assert budget.mode == BudgetMode.NORMAL
+    budget.charge(700)
+    assert budget.mode == BudgetMode.ECONOMY
+    assert max_urls(budget.mode) == 1
+    assert content_budget(budget.mode) is not None
+    budget.charge(200)
+    assert budget.mode == BudgetMode.CONSERVE
+    budget.charge(100)
+    assert budget.mode == BudgetMode.PAUSED
+    assert budget.tokens_remaining == 0
+
+
+def test_run_budget_records_stage_totals_separately_from_spend():
+    budget = RunBudget(max_tokens=1000)
+    budget.record({"analysis": _usage(700), "research": _usage(100)})
+    assert budget.tokens_spent == 0
+    summary = budget.summary()
+    assert summary["run"] == {"companies": 1, "total_tokens": 0}
+    assert summary["analysis"]["requests"] == 1
+    assert summary["research"]["total_tokens"] == 100
+
+
+def test_run_budget_tracks_spend_without_result_and_combines_workers():
+    first, second = RunBudget(), RunBudget()
+    first.record({"research": _usage(100)}, produced_result=False)
+    first.record({"research": _usage(50)})
+    second.record({"research": _usage(30)}, produced_result=False)
+    assert first.summary()["no_result"] == {
+        "companies": 1,
+        "requests": 1,
+        "request_tokens": 90,
+        "response_tokens": 10,
+        "total_tokens": 100,
+    }
+
+    combined = combine_summaries([first.summary(), second.summary()], tokens_spent=180)
+    assert combined["research"]["total_tokens"] == 180
+    assert combined["no_result"]["companies"] == 2
+    assert combined["no_result"]["total_tokens"] == 130
+    assert combined["run"] == {"companies": 3, "total_tokens": 180}
+
+
+def test_run_budget_usage_limits_cover_remaining_budget():
+    budget = RunBudget(max_tokens=1000)
+    budget.charge(600)
+    limits = budget.usage_limits(_usage(150))
+    assert limits.total_tokens_limit == 550
+    assert RunBudget().usage_limits(_usage(150)) is None
+
+
+def test_run_budget_without_ceiling_only_counts():
+    budget = RunBudget()
+    budget.charge(10**9)
+    assert budget.mode == BudgetMode.NORMAL
+    assert budget.tokens_spent == 10**9
+    assert budget.tokens_remaining is None
+
+
+def test_merge_usage_accumulates_per_stage_and_total():
+    stored = merge_usage(None, {"research": _usage(100), "analysis": _usage(50)})
+    stored = merge_usage(stored, {"analysis": _usage(50)})
+    assert stored["analysis"]["total_tokens"] == 100
+    assert stored["analysis"]["requests"] == 2
+    assert stored["total"]["total_tokens"] == 200
+
+
+@pytest.mark.asyncio
+async def test_process_companies_records_usage_and_pauses(scraper, tmp_path):
+    scraper.budget = RunBudget(max_tokens=250)
+    _use_fake_agents(scraper, research_tokens=100, analysis_tokens=50)
+
+    companies = [(f"Company{i}", "Grocery") for i in range(4)]
+    summary = await scraper.process_companies(companies, tmp_path / "out.csv", batch_size=1)
+
+    assert summary.processed == 1
+    assert summary.failed == 1
+    assert summary.skipped == 2
+    assert summary.usage["run"]["total_tokens"] == 300
+    # Company1 was stopped at the ceiling after spending 150 tokens
+    assert summary.usage["no_result"]["companies"] == 1
+    assert summary.usage["no_result"]["total_tokens"] == 150
+    with get_db_session(scraper.engine) as session:
+        record = session.query(Company).filter_by(company_name="Company0").one()
+        assert record.llm_usage["research"]["total_tokens"] == 100
+        assert record.llm_usage["total"]["total_tokens"] == 150
+
+
+@pytest.mark.asyncio
+async def test_agent_call_is_stopped_at_the_ceiling(scraper):
+    scraper.budget = RunBudget(max_tokens=120)
+    scraper.budget.charge(100)
+    _use_fake_agents(scraper, research_tokens=10, analysis_tokens=50)
+
+    query = SearchQuery(company_name="Acme", vertical="Grocery")
+    with pytest.raises(UsageLimitExceeded):
+        await scraper._call_agent(scraper.analysis_agent.analyze_company_data, query, [], usage=Usage())
+    # Tokens spent by the stopped call still count against the run
+    assert scraper.budget.tokens_spent == 150
+    assert scraper.budget.mode == BudgetMode.PAUSED
+
+
+@pytest.mark.asyncio
+async def test_usage_is_kept_when_nothing_is_scraped(scraper):
+    scraper.budget = RunBudget()
+    _use_fake_agents(scraper, research_tokens=100, analysis_tokens=50)
+
+    async def scrape_urls(urls, usage=None, usage_limits=None):
+        return []
+
+    scraper.scraping_agent.scrape_urls = scrape_urls
+
+    with get_db_session(scraper.engine) as session:
+        stale = Company(company_name="Acme", cleaned_name="Acme", vertical="Grocery")
+        stale.last_updated = datetime.now() - timedelta(days=60)
+        session.add(stale)
+        session.commit()
+
+        assert await scraper.process_company("Acme", "Grocery", session) is None
+        assert await scraper.process_company("Globex", "Grocery", session) is None
+        session.refresh(stale)
+        assert stale.llm_usage["research"]["total_tokens"] == 100
+
+    no_result = scraper.budget.summary()["no_result"]
+    assert no_result["companies"] == 2
+    assert no_result["total_tokens"] == 200
+
+
+@pytest.mark.asyncio
+async def test_conserve_mode_skips_low_value_new_companies(scraper):
+    scraper.budget = RunBudget(max_tokens=1000)
+    scraper.budget.charge(900)
+    researched = []
+    _use_fake_agents(scraper, research_tokens=10, analysis_tokens=10, researched=researched)
+
+    with get_db_session(scraper.engine) as session:
+        assert await scraper.process_company("Acme Supply", "General", session) is None
+        assert await scraper.process_company("Acme Foods", "Grocery", session) is not None
+    assert researched == ["Acme Foods"]
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from src.cli import cli
+
+
+def test_cli_import_is_lazy():
+    code = "import sys, src.cli; print(sorted(m for m in ('pandas', 'pydantic_ai', 'sqlalchemy') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_search_command_runs_coroutine(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "companies.db"))
+
+    async def process_company(self, company_name, vertical, session):
+        return None
+
+    monkeypatch.setattr("src.main.RetailWarehouseScraper.process_company", process_company)
+    result = CliRunner().invoke(cli, ["search", "-c", "Test Company"])
+    assert result.exit_code == 0
+    assert "No data found for Test Company" in result.output
+
+
+def test_query_and_export_work_on_fresh_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "companies.db"))
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["query"])
+    assert result.exit_code == 0, result.output
+    assert result.output == ""
+
+    output_path = tmp_path / "out.csv"
+    result = runner.invoke(cli, ["export", "-o", str(output_path)])
+    assert result.exit_code == 0, result.output
+    assert "Exported 0 companies" in result.output
+
+
+def test_scrape_reports_paused_run(tmp_path, monkeypatch):
+    from src.models.company import RunSummary
+
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Company Name,Vertical\nSysco,Foodservice\n")
+
+    async def process_csv(self, input_path, output_path, batch_size=5):
+        usage = {"run": {"companies": 1, "total_tokens": 500}, "no_result": {"companies": 1, "total_tokens": 200}}
+        return RunSummary(processed=1, failed=1, skipped=3, output_path=output_path, usage=usage)
+
+    monkeypatch.setattr("src.main.RetailWarehouseScraper.process_csv", process_csv)
+    result = CliRunner().invoke(cli, ["scrape", "-i", str(input_path), "-o", str(tmp_path / "out.csv")])
+    assert result.exit_code == 0, result.output
+    assert "Token ceiling reached: 3 companies were skipped" in result.output
+    assert "LLM tokens used: 500 (200 on companies without a result)" in result.output
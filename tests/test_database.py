@@ -0,0 +1,53 @@
+import sqlite3
+
+from sqlalchemy import inspect
+
+from src.database.connection import get_db_engine, get_db_session, init_db
+from src.models.database import Company
+from src.tools.entity_resolution import EntityIndex
+
+# companies table as created by the original schema, before any columns were added
+BASELINE_SCHEMA = """
+CREATE TABLE companies (
+    id INTEGER NOT NULL,
+    company_name VARCHAR NOT NULL,
+    cleaned_name VARCHAR NOT NULL,
+    vertical VARCHAR NOT NULL,
+    truck_count INTEGER,
+    warehouse_employee_count INTEGER,
+    facility_count INTEGER,
+    store_count INTEGER,
+    notes VARCHAR,
+    source_references JSON,
+    last_updated DATETIME,
+    confidence_score FLOAT,
+    PRIMARY KEY (id),
+    UNIQUE (company_name)
+)
+"""
+
+
+def test_init_db_migrates_baseline_schema(tmp_path):
+    db_path = tmp_path / "companies.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.execute(
+        "INSERT INTO companies (company_name, cleaned_name, vertical, last_updated, confidence_score) "
+        "VALUES ('Sysco Corp', 'Sysco', 'Foodservice', '2024-01-01 00:00:00', 0.5)"
+    )
+    conn.commit()
+    conn.close()
+
+    engine = init_db(get_db_engine(str(db_path)))
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("companies")}
+    assert {"normalized_name", "metric_provenance", "source_fingerprints", "llm_usage"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("companies")}
+    assert {"ix_companies_truck_count", "ix_companies_vertical", "ix_companies_last_updated"} <= indexes
+
+    with get_db_session(engine) as session:
+        index = EntityIndex.from_session(session)
+        assert index.resolve("SYSCO Corporation") == session.query(Company).one().id
+
+    # Running again on an up-to-date database is a no-op
+    init_db(engine)
@@ -0,0 +1,91 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models.database import Base, Company
+from src.tools.entity_resolution import EntityIndex, clean_company_name, dedupe_companies, normalize_company_name
+
+
+def test_normalize_company_name_collapses_variants():
+    assert normalize_company_name("Sysco Corp") == "sysco"
+    assert normalize_company_name("SYSCO Corporation") == "sysco"
+    assert normalize_company_name("Sysco") == "sysco"
+    assert normalize_company_name("Procter & Gamble Co.") == normalize_company_name("Procter and Gamble")
+    assert normalize_company_name("The Kroger Co.") == "kroger"
+
+
+def test_clean_company_name_keeps_casing():
+    assert clean_company_name("Sysco Corp") == "Sysco"
+    assert clean_company_name("Dollar General Corporation") == "Dollar General"
+    assert clean_company_name("Costco Wholesale Corp.") == "Costco Wholesale"
+
+
+def test_entity_index_exact_and_fuzzy_match():
+    index = EntityIndex()
+    index.add(1, "Sysco Corporation")
+    index.add(2, "Walmart Inc.")
+    assert index.resolve("SYSCO") == 1
+    assert index.resolve("Wal-Mart") == 2
+    index.add(3, "Dollar General Corporation")
+    assert index.resolve("Dollar Generall") == 3
+    assert index.resolve("Target") is None
+
+
+def test_entity_index_never_fuzzy_matches_the_only_distinctive_word():
+    index = EntityIndex()
+    index.add(1, "The Kroger Co.")
+    index.add(2, "Acme Paper Products")
+    assert index.resolve("Kruger Inc") is None
+    assert index.resolve("Walmartt") is None
+    assert index.resolve("Acne Paper Products") is None
+    assert dedupe_companies([("Kroger", "Grocery"), ("Kruger Inc", "Paper & Office Products")]) == [
+        ("Kroger", "Grocery"),
+        ("Kruger Inc", "Paper & Office Products"),
+    ]
+
+
+def test_entity_index_keeps_distinct_words_apart():
+    index = EntityIndex()
+    index.add(1, "Northeast Grocery")
+    index.add(2, "Southeast Frozen Foods")
+    index.add(3, "Penske Truck Leasing")
+    assert index.resolve("Northwest Grocery") is None
+    assert index.resolve("Southwest Frozen Foods") is None
+    assert index.resolve("Penske Truck Leasing UK") is None
+    index.add(4, "Store7 Logistics")
+    assert index.resolve("Store8 Logistics") is None
+    assert index.resolve("Southeast Frozen Food") == 2
+    assert index.resolve("Penske Truck Leasnig") == 3
+
+
+def test_entity_index_from_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Company(company_name="Sysco Corp", cleaned_name="Sysco", vertical="Foodservice"))
+    session.add(
+        Company(
+            company_name="The Kroger Co.", cleaned_name="Kroger", vertical="Grocery", normalized_name="kroger grocery"
+        )
+    )
+    session.commit()
+    index = EntityIndex.from_session(session)
+    sysco, kroger = session.query(Company).order_by(Company.id).all()
+    assert index.resolve("SYSCO Corporation") == sysco.id
+    # Both the input name and the analysis' name resolve after a restart
+    assert index.resolve("Kroger Grocery") == kroger.id
+    assert index.resolve("Kroger") == kroger.id
+
+
+def test_dedupe_companies_keeps_first(caplog):
+    rows = [("Sysco Corp", "Foodservice"), ("Target", "General"), ("SYSCO Corporation", "General")]
+    with caplog.at_level("INFO"):
+        assert dedupe_companies(rows) == [("Sysco Corp", "Foodservice"), ("Target", "General")]
+    assert "'SYSCO Corporation' into 'Sysco Corp'" in caplog.text
+
+
+def test_read_companies_skips_blank_names(tmp_path):
+    from src.main import read_companies
+
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Company Name,Vertical\nSysco Corp,Foodservice\n,Grocery\n   ,Grocery\nTarget,\n")
+    assert read_companies(input_path) == [("Sysco Corp", "Foodservice"), ("Target", "General")]
@@ -0,0 +1,91 @@
+import csv
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.export import export_companies
+from src.database.query import CompanyFilter, iter_companies
+from src.models.database import Base, Company
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    now = datetime.now()
+    session.add_all(
+        [
+            Company(
+                company_name="Sysco",
+                cleaned_name="Sysco",
+                vertical="Foodservice",
+                truck_count=14000,
+                confidence_score=0.9,
+                last_updated=now,
+                source_references=["https://sysco.com"],
+            ),
+            Company(
+                company_name="Small Grocer",
+                cleaned_name="Small Grocer",
+                vertical="Grocery",
+                truck_count=12,
+                confidence_score=0.6,
+                last_updated=now - timedelta(days=90),
+            ),
+            Company(
+                company_name="Kroger",
+                cleaned_name="Kroger",
+                vertical="Grocery",
+                truck_count=None,
+                store_count=2700,
+                confidence_score=1.0,
+                last_updated=now,
+            ),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def _names(session, **filters):
+    return [row["company_name"] for row in iter_companies(session, CompanyFilter(**filters))]
+
+
+def test_iter_companies_filters(session):
+    assert _names(session) == ["Sysco", "Small Grocer", "Kroger"]
+    assert _names(session, verticals=["Grocery"]) == ["Small Grocer", "Kroger"]
+    assert _names(session, metric_min={"truck_count": 101}) == ["Sysco"]
+    assert _names(session, metric_max={"truck_count": 100}) == ["Small Grocer"]
+    assert _names(session, min_confidence=0.8) == ["Sysco", "Kroger"]
+    assert _names(session, max_age_days=30) == ["Sysco", "Kroger"]
+
+
+def test_company_filter_rejects_unknown_metric():
+    with pytest.raises(ValidationError):
+        CompanyFilter(metric_min={"revenue": 1})
+
+
+def test_export_csv_and_jsonl(session, tmp_path):
+    filters = CompanyFilter(verticals=["Foodservice"])
+    assert export_companies(session, filters, tmp_path / "out.csv", "csv") == 1
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["truck_count"] == "14000"
+    assert rows[0]["source_references"] == "https://sysco.com"
+
+    assert export_companies(session, CompanyFilter(), tmp_path / "out.jsonl", "jsonl", chunk_size=1) == 3
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert json.loads(lines[2])["store_count"] == 2700
+
+
+def test_export_parquet(session, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    assert export_companies(session, CompanyFilter(), tmp_path / "out.parquet", "parquet", chunk_size=2) == 3
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.column("company_name").to_pylist() == ["Sysco", "Small Grocer", "Kroger"]
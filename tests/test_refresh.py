@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.connection import get_db_session
+from src.models.company import METRIC_FIELDS, CompanyData, ScrapedData
+from src.models.database import Company
+from src.refresh import NOT_FOUND_RETRY_DAYS, cited_sources, plan_refresh, record_checks, record_metrics
+
+
+def _check(url, content_hash, not_modified=False):
+    return {"url": url, "not_modified": not_modified, "etag": None, "last_modified": None, "content_hash": content_hash}
+
+
+def _company(**metrics):
+    return Company(company_name="Test Company", cleaned_name="Test Company", vertical="Grocery", **metrics)
+
+
+def test_plan_refresh_splits_metrics_by_source_state():
+    now = datetime.now()
+    record = _company(truck_count=10, store_count=5, facility_count=None)
+    checks = {"https://a.com": _check("https://a.com", "a1"), "https://b.com": _check("https://b.com", "b1")}
+    record_checks(record, checks, now)
+    record_metrics(record, {"truck_count": 10}, ["https://a.com"], checks, now)
+    record_metrics(record, {"store_count": 5}, ["https://b.com"], checks, now)
+
+    new_checks = {
+        "https://a.com": _check("https://a.com", None, not_modified=True),
+        "https://b.com": _check("https://b.com", "b2"),
+    }
+    missing, stale, unchanged = plan_refresh(record, new_checks)
+    assert unchanged == ["truck_count"]
+    assert stale == ["store_count"]
+    assert missing == ["facility_count", "warehouse_employee_count"]
+
+
+def test_plan_refresh_treats_unreachable_source_as_stale():
+    now = datetime.now()
+    record = _company(truck_count=10)
+    checks = {"https://a.com": _check("https://a.com", "a1")}
+    record_checks(record, checks, now)
+    record_metrics(record, {"truck_count": 10}, ["https://a.com"], checks, now)
+    assert "truck_count" in plan_refresh(record, {})[1]
+
+
+def test_plan_refresh_retries_not_found_metrics_after_interval():
+    now = datetime.now()
+    record = _company(truck_count=10)
+    checks = {"https://a.com": _check("https://a.com", "a1")}
+    record_checks(record, checks, now)
+    record_metrics(record, {m: getattr(record, m) for m in METRIC_FIELDS}, ["https://a.com"], checks, now)
+    assert record.metric_provenance["store_count"]["not_found_at"] == now.isoformat()
+
+    missing, stale, unchanged = plan_refresh(record, checks, now + timedelta(days=60))
+    assert missing == []
+    assert sorted(unchanged) == sorted(METRIC_FIELDS)
+
+    later = now + timedelta(days=NOT_FOUND_RETRY_DAYS + 1)
+    missing, stale, unchanged = plan_refresh(record, checks, later)
+    assert missing == ["store_count", "facility_count", "warehouse_employee_count"]
+    assert unchanged == ["truck_count"]
+
+
+def test_stale_metric_not_found_again_keeps_value_with_current_hashes():
+    now = datetime.now()
+    record = _company(truck_count=10)
+    checks = {"https://a.com": _check("https://a.com", "a1")}
+    record_checks(record, checks, now)
+    record_metrics(record, {"truck_count": 10}, ["https://a.com"], checks, now)
+
+    new_checks = {"https://a.com": _check("https://a.com", "a2")}
+    assert plan_refresh(record, new_checks)[1] == ["truck_count"]
+    record_checks(record, new_checks, now)
+    record_metrics(record, {"truck_count": None}, ["https://a.com"], new_checks, now)
+    assert record.truck_count == 10
+    assert "truck_count" in plan_refresh(record, new_checks)[2]
+
+
+def test_cited_sources_keeps_only_urls_the_analysis_cited():
+    scraped = [ScrapedData(url=url, content="", extracted_data={}) for url in ("https://a.com/", "https://b.com/")]
+    cited = CompanyData(
+        company_name="Test Company", cleaned_name="Test Company", vertical="Grocery", source_references=["https://b.com/"]
+    )
+    assert cited_sources(cited, scraped) == ["https://b.com/"]
+
+    uncited = CompanyData(company_name="Test Company", cleaned_name="Test Company", vertical="Grocery")
+    assert cited_sources(uncited, scraped) == ["https://a.com/", "https://b.com/"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_rescrapes_changed_sources(scraper):
+    old = datetime.now() - timedelta(days=60)
+    record = _company(truck_count=10, store_count=5, facility_count=2, warehouse_employee_count=50)
+    record.last_updated = old
+    urls = {"truck_count": "https://a.com", "store_count": "https://b.com"}
+    checks = {url: _check(url, url + "-v1") for url in urls.values()}
+    record_checks(record, checks, old)
+    for metric in ("truck_count", "facility_count", "warehouse_employee_count"):
+        record_metrics(record, {metric: getattr(record, metric)}, ["https://a.com"], checks, old)
+    record_metrics(record, {"store_count": 5}, ["https://b.com"], checks, old)
+
+    async def check_source(url, etag=None, last_modified=None):
+        if url == "https://a.com":
+            return _check(url, None, not_modified=True)
+        return _check(url, url + "-v2")
+
+    scraped_urls = []
+
+    async def scrape_urls(urls, usage=None):
+        scraped_urls.extend(urls)
+        return [ScrapedData(url=url, content="200 stores", extracted_data={}) for url in urls]
+
+    async def analyze_company_data(query, scraped_data, usage=None, max_content_chars=None):
+        return CompanyData(
+            company_name="Test Company",
+            cleaned_name="Test Company",
+            vertical="Grocery",
+            truck_count=999,
+            store_count=200,
+        )
+
+    async def research_company(query, usage=None):
+        raise AssertionError("full research should not run when no metric is missing")
+
+    scraper.scraping_agent = SimpleNamespace(
+        firecrawl=SimpleNamespace(check_source=check_source), scrape_urls=scrape_urls
+    )
+    scraper.analysis_agent = SimpleNamespace(analyze_company_data=analyze_company_data)
+    scraper.research_agent = SimpleNamespace(research_company=research_company)
+
+    with get_db_session(scraper.engine) as session:
+        session.add(record)
+        session.commit()
+        result = await scraper.process_company("Test Company", "Grocery", session)
+
+    assert scraped_urls == ["https://b.com"]
+    assert result.store_count == 200
+    assert result.truck_count == 10
@@ -0,0 +1,45 @@
+import csv
+
+from src.models.company import BusinessVertical, CompanyData
+from src.result_buffer import OUTPUT_COLUMNS, ResultBuffer
+
+
+def _company(i, truck_count=None):
+    return CompanyData(
+        company_name=f"Company {i}",
+        cleaned_name=f"Company {i}",
+        vertical=BusinessVertical.GROCERY,
+        truck_count=truck_count,
+        store_count=i,
+        source_references=["https://example.com/about", f"https://example.com/{i}"],
+        confidence_score=0.9,
+    )
+
+
+def test_result_buffer_flushes_in_chunks(tmp_path):
+    output_path = tmp_path / "out.csv"
+    buffer = ResultBuffer(output_path, chunk_size=2)
+    for i in range(5):
+        buffer.append(_company(i, truck_count=10 if i % 2 else None))
+    assert len(buffer) == 1
+    assert buffer.rows_written == 4
+    buffer.flush()
+
+    with open(output_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == OUTPUT_COLUMNS
+    assert [row["Company Name"] for row in rows] == [f"Company {i}" for i in range(5)]
+    assert rows[0]["Truck Count"] == ""
+    assert rows[1]["Truck Count"] == "10"
+    assert rows[3]["Vertical"] == "Grocery"
+    assert rows[3]["Source References"] == "https://example.com/about, https://example.com/3"
+    assert rows[4]["Confidence Score"] == "0.9"
+
+
+def test_result_buffer_replaces_previous_output(tmp_path):
+    output_path = tmp_path / "out.csv"
+    output_path.write_text("stale\n")
+    buffer = ResultBuffer(output_path)
+    buffer.append(_company(1))
+    buffer.flush()
+    assert output_path.read_text().splitlines()[0].startswith("Company Name")
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.models.company import BusinessVertical, CompanyData, RunSummary
+from src.result_buffer import ResultBuffer
+from src.runner import ShardWorkerError, _merge_shards, run_sharded, shard_companies, shard_for
+from src.tools.rate_limiter import SharedRateLimiter
+
+
+def test_shard_for_is_stable_across_name_variants():
+    assert shard_for("Sysco Corp", 16) == shard_for("SYSCO Corporation", 16)
+    assert 0 <= shard_for("Walmart", 4) < 4
+
+
+def test_shard_companies_covers_every_row():
+    companies = [(f"Company {i}", "General") for i in range(100)]
+    shards = shard_companies(companies, 4)
+    assert len(shards) == 4
+    assert sorted(c for shard in shards for c in shard) == sorted(companies)
+
+
+def test_shared_rate_limiter_spaces_requests():
+    limiter = SharedRateLimiter(requests_per_minute=600)
+
+    async def acquire_three():
+        for _ in range(3):
+            await limiter.acquire()
+
+    start = time.time()
+    asyncio.run(acquire_three())
+    assert time.time() - start >= 0.2 - 0.01
+
+
+def test_shared_rate_limiter_rejects_invalid_budget():
+    with pytest.raises(ValueError):
+        SharedRateLimiter(requests_per_minute=0)
+
+
+def _failing_worker(shard_index, companies, output_path, *args):
+    # Module-level so spawned processes can import it; never reaches the real pipeline or network
+    raise RuntimeError(f"worker {shard_index} failed")
+
+
+def test_run_sharded_reports_failed_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "companies.db"))
+    monkeypatch.setattr("src.runner._run_worker", _failing_worker)
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Company Name,Vertical\nSysco,Foodservice\nTarget,General\n")
+
+    with pytest.raises(ShardWorkerError) as excinfo:
+        run_sharded(input_path, tmp_path / "out.csv", workers=2, openai_api_key="test", firecrawl_api_key="test")
+    assert excinfo.value.companies == 2
+    assert excinfo.value.merged_rows == 0
+
+
+def _summarizing_worker(shard_index, companies, output_path, *args):
+    # Spends 10 tokens against the shared budget and reports one company as skipped
+    budget, summaries = args[3], args[5]
+    budget.charge(10)
+    usage = {"analysis": {"total_tokens": 10}, "run": {"companies": len(companies), "total_tokens": 10}}
+    summaries.put(RunSummary(processed=len(companies) - 1, skipped=1, output_path=output_path, usage=usage))
+
+
+def test_run_sharded_combines_worker_summaries(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "companies.db"))
+    monkeypatch.setattr("src.runner._run_worker", _summarizing_worker)
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Company Name,Vertical\nSysco,Foodservice\nTarget,General\nKroger,Grocery\n")
+    companies = shard_companies([("Sysco", "Foodservice"), ("Target", "General"), ("Kroger", "Grocery")], 2)
+    workers = sum(1 for shard in companies if shard)
+
+    summary = run_sharded(
+        input_path, tmp_path / "out.csv", workers=2, openai_api_key="test", firecrawl_api_key="test", max_tokens=100
+    )
+    assert summary.processed == 3 - workers
+    assert summary.skipped == workers
+    assert summary.usage["analysis"]["total_tokens"] == 10 * workers
+    assert summary.usage["run"] == {"companies": 3, "total_tokens": 10 * workers}
+
+
+def _company(i, truck_count):
+    return CompanyData(
+        company_name=f"Company {i}",
+        cleaned_name=f"Company {i}",
+        vertical=BusinessVertical.GROCERY,
+        truck_count=truck_count,
+    )
+
+
+def test_merge_shards_matches_single_process_output(tmp_path):
+    companies = [_company(0, 10), _company(1, None), _company(2, 7)]
+    single = ResultBuffer(tmp_path / "single.csv")
+    for company in companies:
+        single.append(company)
+    single.flush()
+
+    part_paths = []
+    for i, shard in enumerate([companies[:2], companies[2:]]):
+        part = ResultBuffer(tmp_path / f"out.part{i}.csv")
+        for company in shard:
+            part.append(company)
+        part.flush()
+        part_paths.append(part.output_path)
+
+    assert _merge_shards(part_paths, tmp_path / "out.csv") == 3
+    assert (tmp_path / "out.csv").read_text() == (tmp_path / "single.csv").read_text()
+
+
+@pytest.mark.asyncio
+async def test_clients_acquire_limiter_per_request():
+    from src.tools.firecrawl_client import FirecrawlClient
+
+    class CountingLimiter:
+        calls = 0
+
+        async def acquire(self):
+            self.calls += 1
+
+    limiter = CountingLimiter()
+    client = FirecrawlClient(rate_limiter=limiter)
+
+    async def get(url, **kwargs):
+        return httpx.Response(200, content=b"page", request=httpx.Request("GET", url))
+
+    client.client.get = get
+    await client.check_source("https://example.com")
+    await client.scrape("https://example.com")
+    assert limiter.calls == 2